@@ -1,24 +1,61 @@
+from langchain_core.runnables import RunnableBinding, RunnableConfig
 from langgraph.constants import START
 from langgraph.graph import add_messages
 from langgraph.graph.state import CompiledStateGraph, StateGraph
 from langgraph.prebuilt import ToolNode, tools_condition
-from typing_extensions import Annotated, TypedDict
+from langgraph.utils.runnable import RunnableCallable
+from typing_extensions import Annotated, NotRequired, TypedDict
 
+from app.graph.history import aprompt_window, prompt_window
+from app.instrumentation.tracer import with_tracer
 from app.resources.resources import Resources
 
 
 class StockMarketState(TypedDict):
     messages: Annotated[list, add_messages]
     favorite_symbol: str
+    summary: NotRequired[str]
 
 
-def graph(resources: Resources) -> CompiledStateGraph:
-    def __chatbot(graph_state: StockMarketState):
-        return {"messages": [resources.chat_model.invoke(graph_state["messages"])]}
+def graph(resources: Resources) -> CompiledStateGraph | RunnableBinding:
+    def __watch(graph_state: StockMarketState, config: RunnableConfig) -> None:
+        if resources.prefetcher is not None:
+            resources.prefetcher.watch(
+                config["configurable"]["thread_id"],
+                graph_state.get("favorite_symbol"),
+            )
+
+    def __reply(updates: dict, response) -> dict:
+        return {**updates, "messages": [*updates.get("messages", []), response]}
+
+    def __chatbot(graph_state: StockMarketState, config: RunnableConfig):
+        __watch(graph_state, config)
+        prompt, updates = prompt_window(
+            graph_state["messages"],
+            graph_state.get("summary", ""),
+            resources.summary_model,
+            resources.history_token_budget,
+        )
+        return __reply(updates, resources.chat_model.invoke(prompt))
+
+    # Under ainvoke a sync node runs in the event loop's default executor, whose
+    # few threads would cap the number of turns in flight well below the
+    # server's max_concurrency.
+    async def __achatbot(graph_state: StockMarketState, config: RunnableConfig):
+        __watch(graph_state, config)
+        prompt, updates = await aprompt_window(
+            graph_state["messages"],
+            graph_state.get("summary", ""),
+            resources.summary_model,
+            resources.history_token_budget,
+        )
+        return __reply(updates, await resources.chat_model.ainvoke(prompt))
 
     graph_builder = StateGraph(StockMarketState)
 
-    graph_builder.add_node("chatbot", __chatbot)
+    graph_builder.add_node(
+        "chatbot", RunnableCallable(__chatbot, __achatbot, name="chatbot", trace=False)
+    )
 
     tool_node = ToolNode(tools=resources.tools)
     graph_builder.add_node("tools", tool_node)
@@ -31,4 +68,7 @@ def graph(resources: Resources) -> CompiledStateGraph:
     graph_builder.add_edge("tools", "chatbot")
     graph_builder.add_edge(START, "chatbot")
 
-    return graph_builder.compile(checkpointer=resources.memory)
+    compiled_graph = graph_builder.compile(checkpointer=resources.memory)
+    if resources.tracer is not None:
+        compiled_graph = with_tracer(compiled_graph, resources.tracer)
+    return compiled_graph
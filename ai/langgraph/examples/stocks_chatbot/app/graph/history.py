@@ -0,0 +1,127 @@
+from langchain_core.messages import (
+    AnyMessage,
+    HumanMessage,
+    RemoveMessage,
+    SystemMessage,
+    get_buffer_string,
+)
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.runnables import Runnable
+from langgraph.constants import TAG_NOSTREAM
+
+SUMMARY_PROMPT = """Extend the summary of a conversation between a user and a stock \
+market assistant with the new messages below. Keep what the assistant may need later: \
+symbols discussed, figures quoted and the user's preferences. Reply with the summary only.
+
+Current summary:
+{summary}
+
+New messages:
+{messages}"""
+
+
+def split_history(
+    messages: list[AnyMessage], token_budget: int
+) -> tuple[list[AnyMessage], list[AnyMessage]]:
+    """Split messages into (older, recent), with recent fitting token_budget.
+
+    The window always starts at a user message so tool calls and their results
+    stay together, and it keeps at least the latest user turn whatever its size.
+    """
+    tokens = 0
+    window_start = None
+    for i in range(len(messages) - 1, -1, -1):
+        tokens += count_tokens_approximately([messages[i]])
+        if tokens > token_budget and window_start is not None:
+            break
+        if isinstance(messages[i], HumanMessage):
+            window_start = i
+    if window_start is None:
+        return [], messages
+    return messages[:window_start], messages[window_start:]
+
+
+def _summary_prompt(summary: str, older: list[AnyMessage]) -> list[AnyMessage]:
+    prompt = SUMMARY_PROMPT.format(
+        summary=summary or "(empty)", messages=get_buffer_string(older)
+    )
+    return [HumanMessage(prompt)]
+
+
+def fold_summary(summary_model: Runnable, summary: str, older: list[AnyMessage]) -> str:
+    # Tagged so the summary is not streamed to the user as part of the reply.
+    return summary_model.invoke(
+        _summary_prompt(summary, older), config={"tags": [TAG_NOSTREAM]}
+    ).content
+
+
+async def afold_summary(
+    summary_model: Runnable, summary: str, older: list[AnyMessage]
+) -> str:
+    response = await summary_model.ainvoke(
+        _summary_prompt(summary, older), config={"tags": [TAG_NOSTREAM]}
+    )
+    return response.content
+
+
+def _split_window(
+    messages: list[AnyMessage], token_budget: int, low_watermark: int | None
+) -> tuple[list[AnyMessage], list[AnyMessage]]:
+    if count_tokens_approximately(messages) <= token_budget:
+        return [], messages
+    if low_watermark is None:
+        low_watermark = token_budget // 2
+    return split_history(messages, low_watermark)
+
+
+def _window(
+    summary: str, older: list[AnyMessage], recent: list[AnyMessage]
+) -> tuple[list[AnyMessage], dict]:
+    updates = {}
+    if older:
+        updates = {
+            "summary": summary,
+            "messages": [RemoveMessage(id=message.id) for message in older],
+        }
+
+    prompt = recent
+    if summary:
+        prompt = [
+            SystemMessage(f"Summary of the earlier conversation:\n{summary}"),
+            *recent,
+        ]
+    return prompt, updates
+
+
+def prompt_window(
+    messages: list[AnyMessage],
+    summary: str,
+    summary_model: Runnable,
+    token_budget: int,
+    low_watermark: int | None = None,
+) -> tuple[list[AnyMessage], dict]:
+    """Return the prompt for this turn and the state updates that go with it.
+
+    Once the messages exceed token_budget, those that do not fit low_watermark
+    (half the budget by default) are folded into the running summary and
+    removed from the state, so each message is summarized only once and the
+    summary model runs every few turns rather than on every turn.
+    """
+    older, recent = _split_window(messages, token_budget, low_watermark)
+    if older:
+        summary = fold_summary(summary_model, summary, older)
+    return _window(summary, older, recent)
+
+
+async def aprompt_window(
+    messages: list[AnyMessage],
+    summary: str,
+    summary_model: Runnable,
+    token_budget: int,
+    low_watermark: int | None = None,
+) -> tuple[list[AnyMessage], dict]:
+    """Async version of prompt_window."""
+    older, recent = _split_window(messages, token_budget, low_watermark)
+    if older:
+        summary = await afold_summary(summary_model, summary, older)
+    return _window(summary, older, recent)
@@ -0,0 +1,89 @@
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import Executor, ThreadPoolExecutor
+
+from langchain_core.tools import BaseTool
+
+
+def __timeout_message(name: str, timeout: float) -> str:
+    return f"Oops, {name} took longer than {timeout:g}s and was cancelled."
+
+
+def __limit_func(func, name: str, timeout: float, executor: Executor):
+    @functools.wraps(func)
+    def limited(*args, **kwargs):
+        context = contextvars.copy_context()
+        future = executor.submit(context.run, func, *args, **kwargs)
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            future.cancel()
+            return __timeout_message(name, timeout)
+
+    return limited
+
+
+def __limit_func_async(func, name: str, timeout: float, executor: Executor):
+    # Awaits the pool's future instead of blocking a thread of the event
+    # loop's default executor on it, as the tool's default coroutine would.
+    @functools.wraps(func)
+    async def limited(*args, **kwargs):
+        context = contextvars.copy_context()
+        future = executor.submit(context.run, func, *args, **kwargs)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except TimeoutError:
+            return __timeout_message(name, timeout)
+
+    return limited
+
+
+def __limit_coroutine(coroutine, name: str, timeout: float):
+    @functools.wraps(coroutine)
+    async def limited(*args, **kwargs):
+        try:
+            return await asyncio.wait_for(coroutine(*args, **kwargs), timeout)
+        except TimeoutError:
+            return __timeout_message(name, timeout)
+
+    return limited
+
+
+def with_limits(
+    tools: list[BaseTool],
+    max_workers: int = 4,
+    timeout: float = 30.0,
+    timeouts: dict[str, float] | None = None,
+) -> list[BaseTool]:
+    """Return copies of tools that share max_workers threads and time out.
+
+    ToolNode already runs the tool calls of one AIMessage concurrently and keeps
+    their order; this bounds how many sync tool calls run at once across the
+    process and turns a call that exceeds its timeout (timeouts[name], else
+    timeout, including time waiting for a worker) into an error message for
+    the model. A timed out sync call keeps its worker until it returns, since
+    threads cannot be interrupted.
+
+    Under ainvoke a sync call only holds its worker, as the tool's coroutine
+    awaits it. Under invoke, ToolNode runs each call in a thread of its own
+    that blocks on the worker, so a call holds two threads; max_workers still
+    bounds the ones doing the work.
+    """
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
+    limited = []
+    for tool in tools:
+        tool_timeout = (timeouts or {}).get(tool.name, timeout)
+        update = {}
+        if getattr(tool, "func", None) is not None:
+            update["func"] = __limit_func(tool.func, tool.name, tool_timeout, executor)
+        if getattr(tool, "coroutine", None) is not None:
+            update["coroutine"] = __limit_coroutine(
+                tool.coroutine, tool.name, tool_timeout
+            )
+        elif "func" in update:
+            update["coroutine"] = __limit_func_async(
+                tool.func, tool.name, tool_timeout, executor
+            )
+        limited.append(tool.model_copy(update=update))
+    return limited
@@ -1,21 +1,80 @@
+import asyncio
+
 from langchain_core.messages import ToolMessage
-from langchain_core.tools import tool, InjectedToolCallId
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import StructuredTool, tool, InjectedToolCallId
 from langgraph.prebuilt import InjectedState
 from langgraph.types import Command
 from typing_extensions import Annotated
 
 from app.resources.alpha_vantage import AlphaVantageResources
+from app.resources.prefetch import FavoritePrefetcher
 
 
-def tools(alpha_vantage: AlphaVantageResources):
+def tools(
+    alpha_vantage: AlphaVantageResources,
+    prefetcher: FavoritePrefetcher | None = None,
+    batch_timeout: float | None = None,
+):
     @tool
-    def get_intraday_data(symbol: str) -> str:
-        """Search for a stock symbol and get intraday data."""
+    def get_intraday_data(symbol: str) -> dict | str:
+        """Search for a stock symbol and get a summary of its intraday data:
+        price range, VWAP, return and volatility."""
         try:
-            return alpha_vantage.time_series.get_intraday(symbol)
+            return alpha_vantage.get_intraday(symbol).summary()
         except ValueError:
             return f"Oops, we couldn't retrieve the intraday data for {symbol}"
 
+    @tool
+    def get_intraday_bars(symbol: str, limit: int = 20) -> list[dict] | str:
+        """Get the latest intraday OHLCV bars of a stock symbol, up to limit bars.
+        Only use it when the summary from get_intraday_data is not enough."""
+        try:
+            return alpha_vantage.get_intraday(symbol).tail(limit)
+        except ValueError:
+            return f"Oops, we couldn't retrieve the intraday data for {symbol}"
+
+    @tool
+    def get_indicators(symbol: str) -> dict | str:
+        """Get technical indicators of a stock symbol from its 15min bars:
+        SMA(20), EMA(20), RSI(14) and today's VWAP, plus the last close."""
+        try:
+            return alpha_vantage.get_indicators(symbol).model_dump()
+        except ValueError:
+            return f"Oops, we couldn't retrieve the intraday data for {symbol}"
+
+    def __batch_response(results: dict) -> dict:
+        response = {}
+        for symbol, intraday in results.items():
+            if isinstance(intraday, TimeoutError):
+                response[symbol] = (
+                    f"Oops, the intraday data for {symbol} is rate limited, "
+                    "try again in a minute"
+                )
+            elif isinstance(intraday, Exception):
+                response[symbol] = (
+                    f"Oops, we couldn't retrieve the intraday data for {symbol}"
+                )
+            else:
+                response[symbol] = intraday.summary()
+        return response
+
+    async def aget_intraday_data_batch(symbols: list[str]) -> dict:
+        return __batch_response(
+            await alpha_vantage.aget_intraday_many(symbols, timeout=batch_timeout)
+        )
+
+    def get_intraday_data_batch(symbols: list[str]) -> dict:
+        return asyncio.run(aget_intraday_data_batch(symbols))
+
+    get_intraday_data_batch_tool = StructuredTool.from_function(
+        func=get_intraday_data_batch,
+        coroutine=aget_intraday_data_batch,
+        name="get_intraday_data_batch",
+        description="Get intraday data summaries for several stock symbols at once, "
+        "e.g. to compare them.",
+    )
+
     @tool
     def get_favorite_symbol(state: Annotated[dict, InjectedState]) -> str:
         """Get your favorite stock symbol."""
@@ -28,9 +87,14 @@ def tools(alpha_vantage: AlphaVantageResources):
 
     @tool
     def set_favorite_symbol(
-        symbol: str, tool_call_id: Annotated[str, InjectedToolCallId]
+        symbol: str,
+        tool_call_id: Annotated[str, InjectedToolCallId],
+        config: RunnableConfig,
     ) -> Command:
         """Set your favorite stock symbol."""
+        if prefetcher is not None:
+            prefetcher.watch(config["configurable"]["thread_id"], symbol)
+
         if symbol == "":
             response = "You have no favorite symbol set."
         else:
@@ -43,4 +107,11 @@ def tools(alpha_vantage: AlphaVantageResources):
 
         return Command(update=state_update)
 
-    return [get_intraday_data, get_favorite_symbol, set_favorite_symbol]
+    return [
+        get_intraday_data,
+        get_intraday_bars,
+        get_indicators,
+        get_intraday_data_batch_tool,
+        get_favorite_symbol,
+        set_favorite_symbol,
+    ]
@@ -0,0 +1,116 @@
+import time
+from typing import Any, AsyncIterator, Iterator, Sequence
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+)
+
+from app.instrumentation.tracer import SpanTracer
+
+
+class TimedCheckpointer(BaseCheckpointSaver):
+    """Delegates to another checkpointer and records a span for every write.
+
+    Only writes are timed; their payloads are not re-serialized for sizing,
+    since that would cost as much as the write itself.
+    """
+
+    def __init__(self, saver: BaseCheckpointSaver, tracer: SpanTracer):
+        super().__init__(serde=saver.serde)
+        self.saver = saver
+        self.tracer = tracer
+
+    def _record(
+        self, name: str, start: int, config: RunnableConfig, **attributes: Any
+    ) -> None:
+        self.tracer.record(
+            "checkpoint",
+            name,
+            start,
+            time.time_ns(),
+            thread_id=config["configurable"].get("thread_id"),
+            **attributes,
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        return self.saver.get_tuple(config)
+
+    def list(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> Iterator[CheckpointTuple]:
+        return self.saver.list(config, filter=filter, before=before, limit=limit)
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        start = time.time_ns()
+        next_config = self.saver.put(config, checkpoint, metadata, new_versions)
+        self._record("put", start, config, channels=len(new_versions))
+        return next_config
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        start = time.time_ns()
+        self.saver.put_writes(config, writes, task_id, task_path)
+        self._record("put_writes", start, config, writes=len(writes))
+
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        return await self.saver.aget_tuple(config)
+
+    async def alist(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        async for checkpoint_tuple in self.saver.alist(
+            config, filter=filter, before=before, limit=limit
+        ):
+            yield checkpoint_tuple
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        start = time.time_ns()
+        next_config = await self.saver.aput(config, checkpoint, metadata, new_versions)
+        self._record("put", start, config, channels=len(new_versions))
+        return next_config
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        start = time.time_ns()
+        await self.saver.aput_writes(config, writes, task_id, task_path)
+        self._record("put_writes", start, config, writes=len(writes))
+
+    def get_next_version(self, current: Any, channel: Any) -> Any:
+        return self.saver.get_next_version(current, channel)
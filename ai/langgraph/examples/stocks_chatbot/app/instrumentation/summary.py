@@ -0,0 +1,80 @@
+import argparse
+import json
+import statistics
+from collections import defaultdict
+
+
+def percentile(values: list[float], percent: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(percent / 100 * len(values)))]
+
+
+def summarize(path: str) -> list[dict]:
+    """Aggregate the spans of a JSONL file per kind and name, hottest first."""
+    durations: dict[tuple[str, str], list[float]] = defaultdict(list)
+    totals: dict[tuple[str, str], dict[str, int]] = defaultdict(
+        lambda: defaultdict(int)
+    )
+    with open(path) as file:
+        for line in file:
+            span = json.loads(line)
+            key = (span["kind"], span["name"])
+            duration = span["end_time_unix_nano"] - span["start_time_unix_nano"]
+            durations[key].append(duration / 1e6)
+            attributes = span["attributes"]
+            totals[key]["errors"] += "error" in attributes
+            for name in ("input_bytes", "output_bytes", "total_tokens"):
+                totals[key][name] += attributes.get(name) or 0
+
+    rows = [
+        {
+            "kind": kind,
+            "name": name,
+            "count": len(values),
+            "total_ms": sum(values),
+            "mean_ms": statistics.fmean(values),
+            "p50_ms": percentile(values, 50),
+            "p99_ms": percentile(values, 99),
+            **totals[(kind, name)],
+        }
+        for (kind, name), values in durations.items()
+    ]
+    return sorted(rows, key=lambda row: row["total_ms"], reverse=True)
+
+
+def __print_table(rows: list[dict]) -> None:
+    print(
+        f"{'kind':<10} {'name':<32} {'count':>7} {'total ms':>10} {'mean ms':>9} "
+        f"{'p50 ms':>9} {'p99 ms':>9} {'tokens':>9} {'errors':>6}"
+    )
+    for row in rows:
+        print(
+            f"{row['kind']:<10} {str(row['name'])[:32]:<32} {row['count']:>7} "
+            f"{row['total_ms']:>10.1f} {row['mean_ms']:>9.2f} {row['p50_ms']:>9.2f} "
+            f"{row['p99_ms']:>9.2f} {row['total_tokens']:>9} {row['errors']:>6}"
+        )
+
+
+def __parse_args():
+    parser = argparse.ArgumentParser(
+        description="Print the hottest nodes, models, tools and checkpoint writes "
+        "of a span file."
+    )
+    parser.add_argument("path", help="JSONL span file written by SpanExporter")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument(
+        "--kind", default=None, help="only graph, node, model, tool or checkpoint"
+    )
+    parser.add_argument("--json", action="store_true", help="print rows as JSON")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = __parse_args()
+    rows = [row for row in summarize(args.path) if args.kind in (None, row["kind"])][
+        : args.top
+    ]
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        __print_table(rows)
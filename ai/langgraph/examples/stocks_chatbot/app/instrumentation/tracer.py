@@ -0,0 +1,244 @@
+import json
+import threading
+import time
+from typing import Any
+from uuid import UUID, uuid4
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.runnables import RunnableBinding, RunnableConfig
+from langgraph.pregel import Pregel
+
+
+def payload_bytes(payload: Any) -> int:
+    """Approximate size of a payload as its JSON encoding."""
+    try:
+        return len(json.dumps(payload, default=str))
+    except (TypeError, ValueError):
+        return len(str(payload))
+
+
+def token_usage(response: Any) -> dict:
+    usage = {}
+    for generations in response.generations:
+        for generation in generations:
+            message = getattr(generation, "message", None)
+            for name, count in (getattr(message, "usage_metadata", None) or {}).items():
+                if isinstance(count, int):
+                    usage[name] = usage.get(name, 0) + count
+    return usage
+
+
+class SpanExporter:
+    """Appends spans to a JSONL file, one OpenTelemetry-style span per line."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "a", buffering=1)
+        self._lock = threading.Lock()
+
+    def export(self, span: dict) -> None:
+        line = json.dumps(span, default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class SpanTracer(BaseCallbackHandler):
+    """Callback handler that records graph, node, model and tool spans.
+
+    Works with any LangGraph graph: pass it in config["callbacks"] or bind it
+    with with_tracer(compiled_graph, tracer). Node spans are the
+    runs LangGraph names after their node; model spans carry token usage, and
+    every span carries the JSON size of its input and output. Spans are
+    exported when they end, with parent_span_id pointing to the closest
+    recorded ancestor, so nested chains inside a node are folded into it.
+    Spans recorded outside of callbacks join the graph run of their thread.
+    """
+
+    run_inline = True
+
+    def __init__(self, exporter: SpanExporter):
+        self.exporter = exporter
+        self._open: dict[UUID, dict] = {}
+        self._parents: dict[UUID, UUID | None] = {}
+        self._traces: dict[UUID, UUID] = {}
+        self._graph_runs: dict[str, UUID] = {}
+        self._lock = threading.Lock()
+
+    def _start(
+        self,
+        kind: str | None,
+        name: str | None,
+        run_id: UUID,
+        parent_run_id: UUID | None,
+        metadata: dict | None,
+        payload: Any,
+    ) -> None:
+        metadata = metadata or {}
+        with self._lock:
+            trace_id = self._traces.get(parent_run_id, parent_run_id) or run_id
+            self._traces[run_id] = trace_id
+            parent_span_id = self._parents.get(parent_run_id)
+            if kind is None:
+                # Not a span; its children hang off its closest recorded ancestor.
+                self._parents[run_id] = parent_span_id
+                return
+
+            # Spans are their own closest recorded ancestor.
+            self._parents[run_id] = run_id
+            if kind == "graph" and metadata.get("thread_id") is not None:
+                self._graph_runs[metadata["thread_id"]] = run_id
+            self._open[run_id] = {
+                "trace_id": trace_id.hex,
+                "span_id": run_id.hex,
+                "parent_span_id": parent_span_id.hex if parent_span_id else None,
+                "name": name,
+                "kind": kind,
+                "start_time_unix_nano": time.time_ns(),
+                "attributes": {
+                    "node": metadata.get("langgraph_node"),
+                    "step": metadata.get("langgraph_step"),
+                    "thread_id": metadata.get("thread_id"),
+                    "input_bytes": payload_bytes(payload),
+                },
+            }
+
+    def _end(
+        self,
+        run_id: UUID,
+        payload: Any = None,
+        error: BaseException | None = None,
+        **attributes: Any,
+    ) -> None:
+        with self._lock:
+            self._parents.pop(run_id, None)
+            self._traces.pop(run_id, None)
+            span = self._open.pop(run_id, None)
+            if span is None:
+                return
+            thread_id = span["attributes"]["thread_id"]
+            if span["kind"] == "graph" and self._graph_runs.get(thread_id) == run_id:
+                del self._graph_runs[thread_id]
+
+        span["end_time_unix_nano"] = time.time_ns()
+        span["attributes"].update(attributes)
+        if error is None:
+            span["attributes"]["output_bytes"] = payload_bytes(payload)
+        else:
+            span["attributes"]["error"] = f"{type(error).__name__}: {error}"
+        self.exporter.export(span)
+
+    def on_chain_start(
+        self,
+        serialized: Any,
+        inputs: Any,
+        *,
+        run_id: UUID,
+        parent_run_id: UUID | None = None,
+        metadata: dict | None = None,
+        **kwargs: Any,
+    ):
+        name = kwargs.get("name")
+        if parent_run_id is None:
+            kind = "graph"
+        elif metadata and name == metadata.get("langgraph_node"):
+            kind = "node"
+        else:
+            kind = None
+        self._start(kind, name, run_id, parent_run_id, metadata, inputs)
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any):
+        self._end(run_id, outputs)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        self._end(run_id, error=error)
+
+    def on_chat_model_start(
+        self,
+        serialized: Any,
+        messages: Any,
+        *,
+        run_id: UUID,
+        parent_run_id: UUID | None = None,
+        metadata: dict | None = None,
+        **kwargs: Any,
+    ):
+        name = (
+            (metadata or {}).get("ls_model_name")
+            or kwargs.get("name")
+            or (serialized or {}).get("name")
+            or (serialized or {}).get("id", [None])[-1]
+        )
+        self._start("model", name, run_id, parent_run_id, metadata, messages)
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any):
+        self._end(run_id, response.generations, **token_usage(response))
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        self._end(run_id, error=error)
+
+    def on_tool_start(
+        self,
+        serialized: Any,
+        input_str: str,
+        *,
+        run_id: UUID,
+        parent_run_id: UUID | None = None,
+        metadata: dict | None = None,
+        **kwargs: Any,
+    ):
+        name = kwargs.get("name") or (serialized or {}).get("name")
+        self._start("tool", name, run_id, parent_run_id, metadata, input_str)
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any):
+        self._end(run_id, output)
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        self._end(run_id, error=error)
+
+    def record(
+        self,
+        kind: str,
+        name: str,
+        start_time_unix_nano: int,
+        end_time_unix_nano: int,
+        **attributes: Any,
+    ) -> None:
+        """Export a span measured outside of callbacks, e.g. a checkpoint write.
+
+        The span is parented to the graph run in progress on its thread_id
+        attribute, if any, and starts a trace of its own otherwise.
+        """
+        span_id = uuid4().hex
+        trace_id, parent_span_id = span_id, None
+        with self._lock:
+            run_id = self._graph_runs.get(attributes.get("thread_id"))
+            if run_id is not None:
+                trace_id = self._open[run_id]["trace_id"]
+                parent_span_id = run_id.hex
+        self.exporter.export(
+            {
+                "trace_id": trace_id,
+                "span_id": span_id,
+                "parent_span_id": parent_span_id,
+                "name": name,
+                "kind": kind,
+                "start_time_unix_nano": start_time_unix_nano,
+                "end_time_unix_nano": end_time_unix_nano,
+                "attributes": attributes,
+            }
+        )
+
+
+def with_tracer(compiled_graph: Pregel, tracer: SpanTracer) -> RunnableBinding:
+    """Traces every run of compiled_graph, alongside any per-call callbacks.
+
+    compiled_graph.with_config(callbacks=...) is not enough: LangGraph lets the
+    callbacks of a call replace the bound ones instead of adding to them. A
+    RunnableBinding merges them, and forwards the other graph methods, such as
+    update_state() and get_state(), with the tracer in their config as well.
+    """
+    return RunnableBinding(bound=compiled_graph, config={"callbacks": [tracer]})
@@ -1,40 +1,91 @@
+import asyncio
+import os
+import time
 import uuid
+from typing import TYPE_CHECKING
 
-from langchain_core.runnables import RunnableConfig
-from langgraph.graph.state import CompiledStateGraph
+if TYPE_CHECKING:
+    from langchain_core.runnables import RunnableConfig
+    from langgraph.graph.state import CompiledStateGraph
 
-from app.resources.resources import resources
-from app.graph.graph import graph
+# Only the standard library is imported up front: langchain, langgraph, numpy,
+# alpha_vantage and the chat model integration are imported by __build_graph on
+# a worker thread while the first prompt waits for input.
 
 
-def __init_chat(stocks_graph: CompiledStateGraph, graph_config: RunnableConfig):
-    def stream_graph_updates(content: str):
-        events = stocks_graph.stream(
+def __build_graph(graph_config: "RunnableConfig") -> "CompiledStateGraph":
+    from app.graph.graph import graph
+    from app.resources.resources import resources
+
+    stocks_resources = resources(
+        checkpoint_db=os.getenv("STOCKS_CHATBOT_DB"),
+        bar_store_dir=os.getenv("STOCKS_CHATBOT_BARS"),
+        trace_path=os.getenv("STOCKS_CHATBOT_TRACE"),
+    )
+    stocks_graph = graph(stocks_resources)
+
+    stocks_graph.update_state(graph_config, {"favorite_symbol": "AAPL"})
+    if stocks_resources.prefetcher is not None:
+        stocks_resources.prefetcher.watch(
+            graph_config["configurable"]["thread_id"], "AAPL"
+        )
+    return stocks_graph
+
+
+async def __init_chat(graph_config: "RunnableConfig"):
+    graph_task = asyncio.ensure_future(asyncio.to_thread(__build_graph, graph_config))
+
+    async def stream_graph_updates(content: str):
+        start = time.perf_counter()
+        first_token_at = None
+        streaming_reply = False
+
+        stocks_graph = await graph_task
+        from langchain_core.messages import AIMessageChunk, ToolMessage
+
+        events = stocks_graph.astream(
             input={"messages": [{"role": "user", "content": content}]},
             config=graph_config,
-            stream_mode="values",
+            stream_mode="messages",
         )
-        for event in events:
-            event["messages"][-1].pretty_print()
+        async for message, metadata in events:
+            if isinstance(message, ToolMessage):
+                if streaming_reply:
+                    print()
+                    streaming_reply = False
+                message.pretty_print()
+            elif isinstance(message, AIMessageChunk) and isinstance(
+                message.content, str
+            ):
+                if not message.content or metadata.get("langgraph_node") != "chatbot":
+                    continue
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                if not streaming_reply:
+                    print("Assistant: ", end="")
+                    streaming_reply = True
+                print(message.content, end="", flush=True)
+
+        if streaming_reply:
+            print()
+        if first_token_at is not None:
+            print(f"[time to first token: {(first_token_at - start) * 1000:.0f} ms]")
 
     while True:
-        user_input = input("User: ")
+        user_input = await asyncio.to_thread(input, "User: ")
         if user_input.lower() in ["quit", "exit", "q"]:
             print("Goodbye!")
+            # Leaving before the graph is built must not report its errors.
+            graph_task.cancel()
             break
 
-        stream_graph_updates(user_input)
+        await stream_graph_updates(user_input)
 
 
-def __runnable_config():
-    return RunnableConfig(configurable={"thread_id": uuid.uuid4().hex})
+def __runnable_config() -> "RunnableConfig":
+    # RunnableConfig is a TypedDict, so a plain dict avoids importing langchain.
+    return {"configurable": {"thread_id": uuid.uuid4().hex}}
 
 
 if __name__ == "__main__":
-    resources = resources()
-    graph = graph(resources)
-    config = __runnable_config()
-
-    graph.update_state(config, {"favorite_symbol": "AAPL"})
-
-    __init_chat(graph, config)
+    asyncio.run(__init_chat(__runnable_config()))
@@ -1,7 +1,156 @@
-from alpha_vantage.timeseries import TimeSeries
-from pydantic import BaseModel, ConfigDict
+import asyncio
+import functools
+import threading
+import time
+from typing import Any, Protocol, runtime_checkable
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from app.resources.bar_store import BarStore
+from app.resources.bars import IntradayBars
+from app.resources.cache import TTLCache
+from app.resources.indicators import IndicatorEngine, IndicatorSnapshot
+from app.resources.intraday_client import ALPHA_VANTAGE_URL, AsyncIntradayClient
+from app.resources.rate_limit import RateLimiter
+from app.resources.single_flight import SingleFlight
+
+
+@runtime_checkable
+class TimeSeriesProvider(Protocol):
+    def get_intraday(self, symbol: str, interval: str = "15min") -> Any: ...
+
+
+class LazyTimeSeries:
+    """alpha_vantage's TimeSeries, imported and created on the first request."""
+
+    def __init__(self, **client_kwargs: Any):
+        self.client_kwargs = client_kwargs
+        self._client = None
+        self._lock = threading.Lock()
+
+    def get_intraday(self, symbol: str, interval: str = "15min", **kwargs: Any) -> Any:
+        with self._lock:
+            if self._client is None:
+                from alpha_vantage.timeseries import TimeSeries
+
+                self._client = TimeSeries(**self.client_kwargs)
+        return self._client.get_intraday(symbol, interval=interval, **kwargs)
 
 
 class AlphaVantageResources(BaseModel):
-    time_series: TimeSeries
+    time_series: TimeSeriesProvider
+    intraday_cache: TTLCache = Field(default_factory=TTLCache)
+    rate_limiter: RateLimiter = Field(default_factory=lambda: RateLimiter(max_calls=5))
+    api_key: str | None = None
+    base_url: str = ALPHA_VANTAGE_URL
+    max_concurrency: int = 5
+    bar_store: BarStore | None = None
+    bars_window: int = 100
+    indicators: IndicatorEngine = Field(default_factory=IndicatorEngine)
+    fetches: SingleFlight = Field(default_factory=SingleFlight)
     model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    def get_intraday(
+        self, symbol: str, interval: str = "15min", refresh: bool = False
+    ) -> IntradayBars:
+        key = (symbol.upper(), interval)
+        cached = None if refresh else self.intraday_cache.get(key)
+        if cached is not None:
+            return cached
+
+        def __fetch() -> IntradayBars:
+            # A call of the same key may have finished since the check above.
+            cached = None if refresh else self.intraday_cache.get(key)
+            if cached is not None:
+                return cached
+            time.sleep(self.rate_limiter.reserve())
+            data, _ = self.time_series.get_intraday(symbol, interval=interval)
+            bars = self._bars(symbol, interval, data)
+            self.intraday_cache.set(key, bars)
+            return bars
+
+        # Concurrent cache misses of the same symbol share one provider call.
+        return self.fetches.do(key, __fetch)
+
+    def _bars(self, symbol: str, interval: str, data: dict) -> IntradayBars:
+        """Bars of a fresh response, through the bar store when there is one, fed
+        to the indicator engine.
+
+        Alpha Vantage has no "since" parameter, so the store still receives the
+        compact window, but only bars newer than the stored ones are parsed and
+        written, and the result is a view of the latest bars_window stored bars.
+        """
+        if self.bar_store is None:
+            bars = IntradayBars.from_alpha_vantage(symbol, interval, data)
+        else:
+            self.bar_store.append(symbol, interval, data)
+            bars = self.bar_store.read(symbol, interval, limit=self.bars_window)
+        self.indicators.update(bars)
+        return bars
+
+    def get_indicators(self, symbol: str, interval: str = "15min") -> IndicatorSnapshot:
+        """Indicators as of the latest bars, fetching only when the cache is cold."""
+        self.get_intraday(symbol, interval)
+        return self.indicators.snapshot(symbol, interval)
+
+    def async_client(self) -> AsyncIntradayClient:
+        return AsyncIntradayClient(
+            rate_limiter=self.rate_limiter,
+            api_key=self.api_key,
+            base_url=self.base_url,
+            max_concurrency=self.max_concurrency,
+        )
+
+    async def aget_intraday_many(
+        self, symbols: list[str], interval: str = "15min", timeout: float | None = None
+    ) -> dict[str, IntradayBars | Exception]:
+        """Bars of each symbol, from the cache or fetched concurrently.
+
+        Each symbol is cached as soon as it arrives. Symbols still waiting after
+        timeout seconds, typically for a rate limit slot, are cancelled and
+        reported as TimeoutError, so the others are not lost with them.
+        """
+        results = {}
+        missing = []
+        for symbol in dict.fromkeys(symbol.upper() for symbol in symbols):
+            cached = self.intraday_cache.get((symbol, interval))
+            if cached is not None:
+                results[symbol] = cached
+            else:
+                missing.append(symbol)
+
+        if missing:
+            async with self.async_client() as client:
+
+                async def __fetch(symbol: str) -> IntradayBars:
+                    cached = self.intraday_cache.get((symbol, interval))
+                    if cached is not None:
+                        return cached
+                    data, _ = await client.get_intraday(symbol, interval)
+                    bars = self._bars(symbol, interval, data)
+                    self.intraday_cache.set((symbol, interval), bars)
+                    return bars
+
+                fetches = [
+                    asyncio.ensure_future(
+                        self.fetches.ado(
+                            (symbol, interval), functools.partial(__fetch, symbol)
+                        )
+                    )
+                    for symbol in missing
+                ]
+                try:
+                    await asyncio.wait(fetches, timeout=timeout)
+                finally:
+                    # Also when this call is cancelled, so no fetch outlives client.
+                    for fetch in fetches:
+                        fetch.cancel()
+                    await asyncio.gather(*fetches, return_exceptions=True)
+
+            for symbol, fetch in zip(missing, fetches):
+                if fetch.cancelled():
+                    results[symbol] = TimeoutError(f"{symbol} was not fetched in time")
+                else:
+                    results[symbol] = fetch.exception() or fetch.result()
+
+        return results
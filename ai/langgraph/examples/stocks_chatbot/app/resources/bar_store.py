@@ -0,0 +1,117 @@
+import os
+import re
+import threading
+
+import numpy as np
+
+from app.resources.bars import FIELDS, IntradayBars
+
+BAR_DTYPE = np.dtype([("timestamp", "<i8"), *((field, "<f8") for field in FIELDS)])
+
+# Symbols and intervals name the files, so they are checked before use.
+SYMBOL_PATTERN = re.compile(r"[A-Z0-9.\-]{1,16}")
+INTERVAL_PATTERN = re.compile(r"[0-9]{1,3}min")
+
+
+def to_records(data: dict[str, dict[str, str]], after: str | None = None) -> np.ndarray:
+    """Convert Alpha Vantage bars newer than after (a timestamp key) to records."""
+    timestamps = sorted(t for t in data if after is None or t > after)
+    records = np.empty(len(timestamps), dtype=BAR_DTYPE)
+    records["timestamp"] = np.array(timestamps, dtype="datetime64[s]").view("<i8")
+    # Alpha Vantage keys bar fields as "1. open" ... "5. volume".
+    for i, field in enumerate(FIELDS, start=1):
+        records[field] = [float(data[t][f"{i}. {field}"]) for t in timestamps]
+    return records
+
+
+def _last_timestamp(records: np.ndarray) -> str | None:
+    if not len(records):
+        return None
+    last = np.datetime64(int(records["timestamp"][-1]), "s")
+    return str(last).replace("T", " ")
+
+
+class BarStore:
+    """Append-only, memory-mapped store of intraday bars, one file per symbol.
+
+    Each file holds fixed-size little-endian BAR_DTYPE records, oldest first.
+    append() writes only bars newer than the last stored one, and read()
+    returns IntradayBars whose columns are read-only views on the mapped file,
+    so nothing is copied or parsed again. Files only grow, so views handed out
+    earlier stay valid after later appends.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._maps: dict[tuple[str, str], np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, symbol: str, interval: str) -> str:
+        return os.path.join(self.root, f"{symbol}-{interval}.bars")
+
+    @staticmethod
+    def _key(symbol: str, interval: str) -> tuple[str, str]:
+        symbol = symbol.upper()
+        if not SYMBOL_PATTERN.fullmatch(symbol):
+            raise ValueError(f"invalid symbol {symbol!r}")
+        if not INTERVAL_PATTERN.fullmatch(interval):
+            raise ValueError(f"invalid interval {interval!r}")
+        return symbol, interval
+
+    def _records(self, symbol: str, interval: str) -> np.ndarray:
+        key = (symbol, interval)
+        records = self._maps.get(key)
+        if records is None:
+            path = self._path(symbol, interval)
+            # A torn write after a crash leaves a partial record; ignore it.
+            count = (
+                os.path.getsize(path) // BAR_DTYPE.itemsize
+                if os.path.exists(path)
+                else 0
+            )
+            if count:
+                records = np.memmap(path, dtype=BAR_DTYPE, mode="r", shape=(count,))
+            else:
+                records = np.empty(0, dtype=BAR_DTYPE)
+            self._maps[key] = records
+        return records
+
+    def last_timestamp(self, symbol: str, interval: str) -> str | None:
+        """The last stored bar's timestamp, formatted like Alpha Vantage keys."""
+        symbol, interval = self._key(symbol, interval)
+        with self._lock:
+            return _last_timestamp(self._records(symbol, interval))
+
+    def append(
+        self, symbol: str, interval: str, data: dict[str, dict[str, str]]
+    ) -> int:
+        """Store the bars of data newer than the last stored one; returns how many."""
+        symbol, interval = self._key(symbol, interval)
+        with self._lock:
+            records = self._records(symbol, interval)
+            new_records = to_records(data, after=_last_timestamp(records))
+            if not len(new_records):
+                return 0
+
+            with open(self._path(symbol, interval), "ab") as file:
+                file.truncate(len(records) * BAR_DTYPE.itemsize)
+                file.write(new_records.tobytes())
+            del self._maps[(symbol, interval)]
+        return len(new_records)
+
+    def read(
+        self, symbol: str, interval: str, limit: int | None = None
+    ) -> IntradayBars:
+        """The latest limit stored bars (all if None) as zero-copy views."""
+        symbol, interval = self._key(symbol, interval)
+        with self._lock:
+            records = self._records(symbol, interval)
+        if limit is not None:
+            records = records[max(len(records) - limit, 0) :]
+        return IntradayBars(
+            symbol=symbol,
+            interval=interval,
+            timestamps=records["timestamp"].view("datetime64[s]"),
+            **{field: records[field] for field in FIELDS},
+        )
@@ -0,0 +1,85 @@
+import numpy as np
+from pydantic import BaseModel, ConfigDict
+
+FIELDS = ("open", "high", "low", "close", "volume")
+
+
+class IntradayBars(BaseModel):
+    """Intraday OHLCV bars of one symbol as columnar arrays, oldest first."""
+
+    symbol: str
+    interval: str
+    timestamps: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    model_config = ConfigDict(arbitrary_types_allowed=True, frozen=True)
+
+    @classmethod
+    def from_alpha_vantage(
+        cls, symbol: str, interval: str, data: dict[str, dict[str, str]]
+    ) -> "IntradayBars":
+        timestamps = sorted(data)
+        # Alpha Vantage keys bar fields as "1. open" ... "5. volume".
+        columns = {
+            field: np.fromiter(
+                (float(data[timestamp][f"{i}. {field}"]) for timestamp in timestamps),
+                dtype=np.float64,
+                count=len(timestamps),
+            )
+            for i, field in enumerate(FIELDS, start=1)
+        }
+        return cls(
+            symbol=symbol.upper(),
+            interval=interval,
+            timestamps=np.array(timestamps, dtype="datetime64[s]"),
+            **columns,
+        )
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def nbytes(self) -> int:
+        return self.timestamps.nbytes + sum(getattr(self, f).nbytes for f in FIELDS)
+
+    def vwap(self) -> float:
+        typical_price = (self.high + self.low + self.close) / 3
+        total_volume = self.volume.sum()
+        if not total_volume:
+            return float(typical_price.mean())
+        return float((typical_price * self.volume).sum() / total_volume)
+
+    def summary(self) -> dict:
+        if not len(self):
+            return {"symbol": self.symbol, "interval": self.interval, "bars": 0}
+
+        log_returns = np.diff(np.log(self.close))
+        return {
+            "symbol": self.symbol,
+            "interval": self.interval,
+            "bars": len(self),
+            "from": str(self.timestamps[0]),
+            "to": str(self.timestamps[-1]),
+            "last_close": round(float(self.close[-1]), 4),
+            "low": round(float(self.low.min()), 4),
+            "high": round(float(self.high.max()), 4),
+            "vwap": round(self.vwap(), 4),
+            "return_pct": round(float(self.close[-1] / self.open[0] - 1) * 100, 3),
+            "volatility_pct": round(float(log_returns.std()) * 100, 3)
+            if len(log_returns)
+            else 0.0,
+            "volume": int(self.volume.sum()),
+        }
+
+    def tail(self, limit: int) -> list[dict]:
+        start = max(len(self) - limit, 0)
+        return [
+            {
+                "timestamp": str(self.timestamps[i]),
+                **{field: float(getattr(self, field)[i]) for field in FIELDS},
+            }
+            for i in range(start, len(self))
+        ]
@@ -0,0 +1,71 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Generic, Hashable, TypeVar
+
+from pydantic import BaseModel
+from typing_extensions import Callable
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class CacheMetrics(BaseModel):
+    hits: int = 0
+    misses: int = 0
+    expirations: int = 0
+    evictions: int = 0
+    size: int = 0
+
+
+class TTLCache(Generic[K, V]):
+    """Thread-safe LRU cache whose entries expire ttl seconds after being set."""
+
+    def __init__(
+        self,
+        max_size: int = 128,
+        ttl: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._metrics = CacheMetrics()
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._metrics.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at <= self.clock():
+                del self._entries[key]
+                self._metrics.expirations += 1
+                self._metrics.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._metrics.hits += 1
+            return value
+
+    def ttl_left(self, key: K) -> float:
+        """Seconds until key expires, 0 if absent; counts as neither hit nor miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return 0.0 if entry is None else max(0.0, entry[0] - self.clock())
+
+    def set(self, key: K, value: V) -> None:
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._metrics.evictions += 1
+
+    def metrics(self) -> CacheMetrics:
+        with self._lock:
+            return self._metrics.model_copy(update={"size": len(self._entries)})
@@ -0,0 +1,166 @@
+import asyncio
+import sqlite3
+import time
+from datetime import datetime
+from typing import Any, AsyncIterator, Sequence
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+)
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+
+class PruningSqliteSaver(SqliteSaver):
+    """SqliteSaver (WAL mode) that enforces a retention policy on every write.
+
+    keep_last keeps only the newest N checkpoints of each thread and namespace.
+    max_age drops threads whose latest checkpoint is older than max_age seconds;
+    it is swept every sweep_every writes so each write stays cheap.
+
+    SqliteSaver has no async API, so the async methods run the sync ones on a
+    worker thread; this lets astream use the same checkpointer.
+    """
+
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        keep_last: int | None = 20,
+        max_age: float | None = None,
+        sweep_every: int = 100,
+    ):
+        super().__init__(conn)
+        self.keep_last = keep_last
+        self.max_age = max_age
+        self.sweep_every = sweep_every
+        self._writes_since_sweep = 0
+
+    @classmethod
+    def from_path(cls, path: str, **retention) -> "PruningSqliteSaver":
+        return cls(sqlite3.connect(path, check_same_thread=False), **retention)
+
+    def setup(self) -> None:
+        if self.is_setup:
+            return
+        super().setup()
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS checkpoint_times (
+                thread_id TEXT NOT NULL,
+                checkpoint_ns TEXT NOT NULL DEFAULT '',
+                checkpoint_id TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+            );
+            CREATE INDEX IF NOT EXISTS checkpoint_times_created_at
+                ON checkpoint_times (created_at);
+            """
+        )
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        next_config = super().put(config, checkpoint, metadata, new_versions)
+        thread_id = next_config["configurable"]["thread_id"]
+        checkpoint_ns = next_config["configurable"].get("checkpoint_ns", "")
+
+        with self.cursor() as cur:
+            cur.execute(
+                "INSERT OR REPLACE INTO checkpoint_times VALUES (?, ?, ?, ?)",
+                (
+                    thread_id,
+                    checkpoint_ns,
+                    checkpoint["id"],
+                    datetime.fromisoformat(checkpoint["ts"]).timestamp(),
+                ),
+            )
+            if self.keep_last is not None:
+                self._prune_thread(cur, thread_id, checkpoint_ns)
+
+        self._writes_since_sweep += 1
+        if self.max_age is not None and self._writes_since_sweep >= self.sweep_every:
+            self._writes_since_sweep = 0
+            self.sweep()
+        return next_config
+
+    def _prune_thread(
+        self, cur: sqlite3.Cursor, thread_id: str, checkpoint_ns: str
+    ) -> None:
+        # Checkpoint ids are time-ordered UUIDs, the same order SqliteSaver uses.
+        cutoff = cur.execute(
+            """
+            SELECT checkpoint_id FROM checkpoints
+            WHERE thread_id = ? AND checkpoint_ns = ?
+            ORDER BY checkpoint_id DESC LIMIT 1 OFFSET ?
+            """,
+            (thread_id, checkpoint_ns, self.keep_last - 1),
+        ).fetchone()
+        if cutoff is None:
+            return
+
+        for table in ("checkpoints", "writes", "checkpoint_times"):
+            cur.execute(
+                f"""
+                DELETE FROM {table}
+                WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id < ?
+                """,
+                (thread_id, checkpoint_ns, cutoff[0]),
+            )
+
+    def sweep(self) -> None:
+        """Drop every thread whose latest checkpoint is older than max_age."""
+        cutoff = time.time() - self.max_age
+        with self.cursor() as cur:
+            expired = cur.execute(
+                """
+                SELECT thread_id FROM checkpoint_times
+                GROUP BY thread_id HAVING MAX(created_at) < ?
+                """,
+                (cutoff,),
+            ).fetchall()
+            for table in ("checkpoints", "writes", "checkpoint_times"):
+                cur.executemany(f"DELETE FROM {table} WHERE thread_id = ?", expired)
+
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        checkpoints = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for checkpoint in checkpoints:
+            yield checkpoint
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(
+            self.put, config, checkpoint, metadata, new_versions
+        )
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
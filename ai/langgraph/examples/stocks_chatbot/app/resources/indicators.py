@@ -0,0 +1,181 @@
+import threading
+from collections import deque
+
+import numpy as np
+from pydantic import BaseModel
+
+from app.resources.bars import IntradayBars
+
+
+class IndicatorSnapshot(BaseModel):
+    symbol: str
+    interval: str
+    bars: int
+    as_of: str | None = None
+    last_close: float | None = None
+    sma: float | None = None
+    ema: float | None = None
+    rsi: float | None = None
+    vwap: float | None = None
+
+
+def _round(value: float | None) -> float | None:
+    return None if value is None else round(value, 4)
+
+
+class IndicatorState:
+    """Running SMA, EMA, Wilder RSI and daily VWAP of one symbol and interval.
+
+    update() takes one bar in O(1): the SMA keeps a ring of the last
+    sma_period closes and their sum, the EMA and RSI averages are smoothed
+    in place, and the VWAP sums restart at the first bar of each day.
+    """
+
+    def __init__(
+        self, sma_period: int = 20, ema_period: int = 20, rsi_period: int = 14
+    ):
+        self.sma_period = sma_period
+        self.ema_alpha = 2 / (ema_period + 1)
+        self.rsi_period = rsi_period
+        self.bars = 0
+        self.last_timestamp: np.datetime64 | None = None
+        self.last_close: float | None = None
+        self._window: deque[float] = deque(maxlen=sma_period)
+        self._window_sum = 0.0
+        self.ema: float | None = None
+        self._changes = 0
+        self._avg_gain = 0.0
+        self._avg_loss = 0.0
+        self._day: np.datetime64 | None = None
+        self._price_volume = 0.0
+        self._volume = 0.0
+
+    def update(
+        self,
+        timestamp: np.datetime64,
+        high: float,
+        low: float,
+        close: float,
+        volume: float,
+    ) -> None:
+        if len(self._window) == self.sma_period:
+            self._window_sum -= self._window[0]
+        self._window.append(close)
+        self._window_sum += close
+
+        self.ema = (
+            close
+            if self.ema is None
+            else self.ema + self.ema_alpha * (close - self.ema)
+        )
+
+        if self.last_close is not None:
+            change = close - self.last_close
+            gain, loss = max(change, 0.0), max(-change, 0.0)
+            self._changes += 1
+            if self._changes <= self.rsi_period:
+                # Simple average of the first rsi_period changes seeds Wilder's.
+                self._avg_gain += gain / self.rsi_period
+                self._avg_loss += loss / self.rsi_period
+            else:
+                self._avg_gain += (gain - self._avg_gain) / self.rsi_period
+                self._avg_loss += (loss - self._avg_loss) / self.rsi_period
+
+        day = timestamp.astype("datetime64[D]")
+        if day != self._day:
+            self._day = day
+            self._price_volume = self._volume = 0.0
+        self._price_volume += (high + low + close) / 3 * volume
+        self._volume += volume
+
+        self.bars += 1
+        self.last_timestamp = timestamp
+        self.last_close = close
+
+    @property
+    def sma(self) -> float | None:
+        if len(self._window) < self.sma_period:
+            return None
+        return self._window_sum / self.sma_period
+
+    @property
+    def rsi(self) -> float | None:
+        if self._changes < self.rsi_period:
+            return None
+        if not self._avg_loss:
+            return 100.0
+        return 100 - 100 / (1 + self._avg_gain / self._avg_loss)
+
+    @property
+    def vwap(self) -> float | None:
+        if not self._volume:
+            return None
+        return self._price_volume / self._volume
+
+
+class IndicatorEngine:
+    """Per-symbol indicator states fed with the bars seen by AlphaVantageResources.
+
+    update() only feeds bars newer than the last one a state has seen, found
+    by binary search on the timestamps, so repeated or overlapping windows
+    never rescan history.
+    """
+
+    def __init__(
+        self, sma_period: int = 20, ema_period: int = 20, rsi_period: int = 14
+    ):
+        self.sma_period = sma_period
+        self.ema_period = ema_period
+        self.rsi_period = rsi_period
+        self._states: dict[tuple[str, str], IndicatorState] = {}
+        self._lock = threading.Lock()
+
+    def update(self, bars: IntradayBars) -> IndicatorSnapshot:
+        key = (bars.symbol, bars.interval)
+        with self._lock:
+            state = self._states.get(key)
+            if state is None:
+                state = IndicatorState(
+                    self.sma_period, self.ema_period, self.rsi_period
+                )
+                self._states[key] = state
+
+            start = (
+                0
+                if state.last_timestamp is None
+                else int(
+                    np.searchsorted(bars.timestamps, state.last_timestamp, "right")
+                )
+            )
+            for i in range(start, len(bars)):
+                state.update(
+                    bars.timestamps[i],
+                    float(bars.high[i]),
+                    float(bars.low[i]),
+                    float(bars.close[i]),
+                    float(bars.volume[i]),
+                )
+            return self._snapshot(bars.symbol, bars.interval, state)
+
+    def snapshot(self, symbol: str, interval: str = "15min") -> IndicatorSnapshot:
+        symbol = symbol.upper()
+        with self._lock:
+            state = self._states.get((symbol, interval))
+            if state is None:
+                return IndicatorSnapshot(symbol=symbol, interval=interval, bars=0)
+            return self._snapshot(symbol, interval, state)
+
+    def _snapshot(
+        self, symbol: str, interval: str, state: IndicatorState
+    ) -> IndicatorSnapshot:
+        return IndicatorSnapshot(
+            symbol=symbol,
+            interval=interval,
+            bars=state.bars,
+            as_of=None if state.last_timestamp is None else str(state.last_timestamp),
+            last_close=_round(state.last_close),
+            sma=_round(state.sma),
+            ema=_round(state.ema),
+            rsi=_round(state.rsi),
+            vwap=_round(state.vwap),
+        )
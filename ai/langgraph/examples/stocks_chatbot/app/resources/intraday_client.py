@@ -0,0 +1,93 @@
+import asyncio
+import os
+from typing import Any
+
+import httpx
+
+from app.resources.rate_limit import RateLimiter
+
+ALPHA_VANTAGE_URL = "https://www.alphavantage.co/query"
+
+
+class AsyncIntradayClient:
+    """Async Alpha Vantage intraday client over one pooled HTTP connection pool.
+
+    At most max_concurrency requests are in flight, and every request first
+    reserves a slot on the shared rate limiter so batches stay under the quota.
+    A request cancelled while it waits for its slot gives the slot back.
+    """
+
+    def __init__(
+        self,
+        rate_limiter: RateLimiter,
+        api_key: str | None = None,
+        base_url: str = ALPHA_VANTAGE_URL,
+        max_concurrency: int = 5,
+        timeout: float = 10.0,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self.rate_limiter = rate_limiter
+        self.api_key = api_key or os.getenv("ALPHAVANTAGE_API_KEY")
+        self.base_url = base_url
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._http = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_concurrency,
+                max_keepalive_connections=max_concurrency,
+            ),
+            timeout=timeout,
+            transport=transport,
+        )
+
+    async def get_intraday(
+        self, symbol: str, interval: str = "15min"
+    ) -> tuple[dict, dict]:
+        async with self._semaphore:
+            slot = self.rate_limiter.reserve_slot()
+            try:
+                await asyncio.sleep(max(0.0, slot - self.rate_limiter.clock()))
+            except asyncio.CancelledError:
+                self.rate_limiter.cancel(slot)
+                raise
+            response = await self._http.get(
+                self.base_url,
+                params={
+                    "function": "TIME_SERIES_INTRADAY",
+                    "symbol": symbol,
+                    "interval": interval,
+                    "outputsize": "compact",
+                    "apikey": self.api_key,
+                },
+            )
+        response.raise_for_status()
+        return parse_intraday(response.json(), interval)
+
+    async def get_intraday_many(
+        self, symbols: list[str], interval: str = "15min"
+    ) -> list[tuple[dict, dict] | Exception]:
+        return await asyncio.gather(
+            *(self.get_intraday(symbol, interval) for symbol in symbols),
+            return_exceptions=True,
+        )
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+    async def __aenter__(self) -> "AsyncIntradayClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+
+def parse_intraday(payload: dict, interval: str) -> tuple[dict, dict]:
+    """Split a TIME_SERIES_INTRADAY payload like alpha_vantage's TimeSeries does."""
+    if "Error Message" in payload:
+        raise ValueError(payload["Error Message"])
+
+    series_key = f"Time Series ({interval})"
+    if series_key not in payload:
+        # Quota and premium notices come back as 200 with an Information/Note key.
+        raise ValueError(payload.get("Information") or payload.get("Note") or payload)
+
+    return payload[series_key], payload["Meta Data"]
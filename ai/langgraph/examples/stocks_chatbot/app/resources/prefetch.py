@@ -0,0 +1,137 @@
+import logging
+import threading
+import time
+
+from pydantic import BaseModel
+from typing_extensions import Callable
+
+from app.resources.alpha_vantage import AlphaVantageResources
+
+logger = logging.getLogger(__name__)
+
+
+class PrefetchMetrics(BaseModel):
+    refreshes: int = 0
+    failures: int = 0
+    skipped_fresh: int = 0
+    deferred: int = 0
+    sessions: int = 0
+    symbols: int = 0
+
+
+class FavoritePrefetcher:
+    """Keeps the intraday data of each session's favorite symbol warm.
+
+    watch(thread_id, symbol) registers or renews a session; a daemon thread then
+    refetches every watched symbol each interval seconds, so with an interval
+    below the cache TTL favorite-symbol questions never pay a cold fetch.
+    Sessions not watched again within idle_timeout seconds are dropped, and the
+    thread exits once no session is left. Symbols shared by several sessions
+    are fetched once, through the same rate limiter as the tools.
+
+    Prefetching yields to interactive requests: a symbol whose cached data
+    outlives the next check is skipped, and a refresh is deferred while
+    fewer than reserved_slots + 1 rate limit slots are free.
+    """
+
+    def __init__(
+        self,
+        alpha_vantage: AlphaVantageResources,
+        interval: float = 240.0,
+        idle_timeout: float = 900.0,
+        intraday_interval: str = "15min",
+        reserved_slots: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.alpha_vantage = alpha_vantage
+        self.interval = interval
+        self.idle_timeout = idle_timeout
+        self.intraday_interval = intraday_interval
+        self.reserved_slots = reserved_slots
+        self.clock = clock
+        self._sessions: dict[str, tuple[str, float]] = {}
+        self._due: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._metrics = PrefetchMetrics()
+
+    def watch(self, thread_id: str, symbol: str | None) -> None:
+        if not symbol:
+            self.forget(thread_id)
+            return
+
+        symbol = symbol.upper()
+        with self._lock:
+            self._sessions[thread_id] = (symbol, self.clock())
+            if symbol not in self._due:
+                self._due[symbol] = self.clock()
+                self._wake.set()
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="favorite-prefetch", daemon=True
+                )
+                self._thread.start()
+
+    def forget(self, thread_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(thread_id, None)
+
+    def _next_due(self) -> tuple[str | None, float | None]:
+        """Drops idle sessions and unwatched symbols, then picks the next symbol."""
+        now = self.clock()
+        with self._lock:
+            for thread_id, (_, seen_at) in list(self._sessions.items()):
+                if now - seen_at > self.idle_timeout:
+                    del self._sessions[thread_id]
+            watched = {symbol for symbol, _ in self._sessions.values()}
+            self._due = {s: due for s, due in self._due.items() if s in watched}
+            if not self._due:
+                self._thread = None
+                return None, None
+
+            symbol = min(self._due, key=self._due.get)
+            return symbol, self._due[symbol] - now
+
+    def _run(self) -> None:
+        while True:
+            symbol, wait = self._next_due()
+            if symbol is None:
+                return
+            if wait > 0:
+                # Wake up early when a new symbol is watched, and at the latest
+                # when the next session could have gone idle.
+                self._wake.wait(min(wait, self.idle_timeout))
+                self._wake.clear()
+                continue
+
+            due_in = self.interval
+            cache = self.alpha_vantage.intraday_cache
+            rate_limiter = self.alpha_vantage.rate_limiter
+            if cache.ttl_left((symbol, self.intraday_interval)) > self.interval:
+                # Still fresh at the next check, e.g. a tool fetched it meanwhile.
+                outcome = "skipped_fresh"
+            elif rate_limiter.free_slots() <= self.reserved_slots:
+                outcome = "deferred"
+                due_in = min(
+                    self.interval, rate_limiter.period / rate_limiter.max_calls
+                )
+            else:
+                try:
+                    self.alpha_vantage.get_intraday(
+                        symbol, self.intraday_interval, refresh=True
+                    )
+                    outcome = "refreshes"
+                except Exception:
+                    logger.warning("prefetching %s failed", symbol, exc_info=True)
+                    outcome = "failures"
+            with self._lock:
+                setattr(self._metrics, outcome, getattr(self._metrics, outcome) + 1)
+                if symbol in self._due:
+                    self._due[symbol] = self.clock() + due_in
+
+    def metrics(self) -> PrefetchMetrics:
+        with self._lock:
+            return self._metrics.model_copy(
+                update={"sessions": len(self._sessions), "symbols": len(self._due)}
+            )
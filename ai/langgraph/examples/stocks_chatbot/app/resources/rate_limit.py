@@ -0,0 +1,62 @@
+import threading
+import time
+from collections import deque
+
+from typing_extensions import Callable
+
+
+class RateLimiter:
+    """Sliding-window limit of max_calls per period seconds.
+
+    reserve() books the next free slot and returns how long the caller must wait
+    before using it, so the same limiter works for threads and any event loop.
+    A caller that gives up before its slot comes can cancel() it, booked with
+    reserve_slot(), so the slot goes to the next caller instead of the quota.
+    """
+
+    def __init__(
+        self,
+        max_calls: int,
+        period: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_calls = max_calls
+        self.period = period
+        self.clock = clock
+        self._calls: deque[float] = deque()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = self.clock()
+            return max(0.0, self._book(now) - now)
+
+    def reserve_slot(self) -> float:
+        """Book the next free slot and return its time on self.clock."""
+        with self._lock:
+            return self._book(self.clock())
+
+    def cancel(self, slot: float) -> None:
+        """Give back a slot from reserve_slot() that was never used."""
+        with self._lock:
+            try:
+                self._calls.remove(slot)
+            except ValueError:
+                pass  # Already out of the window.
+
+    def free_slots(self) -> int:
+        """How many calls could start now without waiting; books nothing."""
+        with self._lock:
+            cutoff = self.clock() - self.period
+            booked = sum(slot > cutoff for slot in self._calls)
+            return max(0, self.max_calls - booked)
+
+    def _book(self, now: float) -> float:
+        while self._calls and self._calls[0] <= now - self.period:
+            self._calls.popleft()
+
+        slot = now
+        if len(self._calls) >= self.max_calls:
+            slot = self._calls[-self.max_calls] + self.period
+        self._calls.append(slot)
+        return slot
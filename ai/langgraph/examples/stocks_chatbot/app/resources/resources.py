@@ -1,28 +1,111 @@
-from alpha_vantage.timeseries import TimeSeries
-from langchain.chat_models import init_chat_model
+from langchain_core.language_models import BaseChatModel
 from langchain_core.runnables import Runnable
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.checkpoint.memory import MemorySaver
 from pydantic import BaseModel, ConfigDict
 from typing_extensions import Callable
 
-from app.resources.alpha_vantage import AlphaVantageResources
+from app.graph.tool_limits import with_limits
 from app.graph.tools import tools
+from app.instrumentation.checkpointer import TimedCheckpointer
+from app.instrumentation.tracer import SpanExporter, SpanTracer
+from app.resources.alpha_vantage import (
+    AlphaVantageResources,
+    LazyTimeSeries,
+    TimeSeriesProvider,
+)
+from app.resources.bar_store import BarStore
+from app.resources.cache import TTLCache
+from app.resources.prefetch import FavoritePrefetcher
+from app.resources.rate_limit import RateLimiter
 
 
 class Resources(BaseModel):
     chat_model: Runnable
-    memory: MemorySaver
+    summary_model: Runnable
+    history_token_budget: int = 4000
+    memory: BaseCheckpointSaver
     tools: list[Callable]
+    prefetcher: FavoritePrefetcher | None = None
+    tracer: SpanTracer | None = None
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
 
-def resources(model: str = "google_genai:gemini-2.0-flash") -> Resources:
-    alpha_vantage = AlphaVantageResources(time_series=TimeSeries())
-    llm_tools = tools(alpha_vantage)
-    llm = init_chat_model(model, temperature=0)
+def checkpointer(
+    checkpoint_db: str | None = None,
+    keep_last_checkpoints: int | None = 20,
+    max_checkpoint_age: float | None = None,
+) -> BaseCheckpointSaver:
+    if checkpoint_db is None:
+        return MemorySaver()
+    from app.resources.checkpointer import PruningSqliteSaver
+
+    return PruningSqliteSaver.from_path(
+        checkpoint_db, keep_last=keep_last_checkpoints, max_age=max_checkpoint_age
+    )
+
+
+def resources(
+    model: str = "google_genai:gemini-2.0-flash",
+    intraday_ttl: float = 300.0,
+    intraday_cache_size: int = 128,
+    requests_per_minute: int = 5,
+    max_concurrency: int = 5,
+    checkpoint_db: str | None = None,
+    keep_last_checkpoints: int | None = 20,
+    max_checkpoint_age: float | None = None,
+    history_token_budget: int = 4000,
+    tool_workers: int = 4,
+    tool_timeout: float = 30.0,
+    tool_timeouts: dict[str, float] | None = None,
+    prefetch_interval: float | None = 240.0,
+    prefetch_idle_timeout: float = 900.0,
+    bar_store_dir: str | None = None,
+    trace_path: str | None = None,
+    chat_model: BaseChatModel | None = None,
+    summary_model: Runnable | None = None,
+    time_series: TimeSeriesProvider | None = None,
+) -> Resources:
+    alpha_vantage = AlphaVantageResources(
+        time_series=time_series or LazyTimeSeries(),
+        intraday_cache=TTLCache(max_size=intraday_cache_size, ttl=intraday_ttl),
+        rate_limiter=RateLimiter(max_calls=requests_per_minute),
+        max_concurrency=max_concurrency,
+        bar_store=BarStore(bar_store_dir) if bar_store_dir else None,
+    )
+    # Prefetching only pays off if the refreshed data stays cached until asked for.
+    prefetcher = (
+        FavoritePrefetcher(alpha_vantage, prefetch_interval, prefetch_idle_timeout)
+        if prefetch_interval and intraday_ttl > 0
+        else None
+    )
+    # The batch tool stops waiting for rate limited symbols a little before its
+    # own timeout, so it still answers with the symbols fetched by then.
+    batch_timeout = 0.9 * (tool_timeouts or {}).get(
+        "get_intraday_data_batch", tool_timeout
+    )
+    llm_tools = with_limits(
+        tools(alpha_vantage, prefetcher, batch_timeout),
+        tool_workers,
+        tool_timeout,
+        tool_timeouts,
+    )
+    if chat_model is None:
+        # Imports the provider integration, one of the slowest steps of startup.
+        from langchain.chat_models import init_chat_model
+
+        chat_model = init_chat_model(model, temperature=0)
+    memory = checkpointer(checkpoint_db, keep_last_checkpoints, max_checkpoint_age)
+    tracer = SpanTracer(SpanExporter(trace_path)) if trace_path else None
+    if tracer is not None:
+        memory = TimedCheckpointer(memory, tracer)
 
     return Resources(
-        chat_model=llm.bind_tools(llm_tools),
-        memory=MemorySaver(),
+        chat_model=chat_model.bind_tools(llm_tools),
+        summary_model=summary_model or chat_model,
+        history_token_budget=history_token_budget,
+        memory=memory,
         tools=llm_tools,
+        prefetcher=prefetcher,
+        tracer=tracer,
     )
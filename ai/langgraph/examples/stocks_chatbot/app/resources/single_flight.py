@@ -0,0 +1,140 @@
+import asyncio
+import threading
+from typing import Awaitable, Generic, Hashable, TypeVar
+
+from pydantic import BaseModel
+from typing_extensions import Callable
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class SingleFlightMetrics(BaseModel):
+    calls: int = 0
+    executions: int = 0
+    coalesced: int = 0
+    in_flight: int = 0
+
+
+class _Call:
+    def __init__(self, loop: asyncio.AbstractEventLoop | None = None):
+        self.loop = loop
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+        self.waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    def resolve(self, future: asyncio.Future) -> None:
+        # The follower reads the outcome from the call, so a cancelled leader
+        # is not mistaken for the follower being cancelled itself.
+        if not future.done():  # Done if the follower was cancelled.
+            future.set_result(None)
+
+    @property
+    def cancelled(self) -> bool:
+        return isinstance(self.error, asyncio.CancelledError)
+
+    def outcome(self):
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def _running_loop() -> asyncio.AbstractEventLoop | None:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+class SingleFlight(Generic[K, V]):
+    """Runs at most one call per key at a time; concurrent callers share it.
+
+    do() and ado() share one table of calls, so threads and tasks of any event
+    loop coalesce with each other: the first caller of a key runs the function
+    and every caller that arrives while it runs gets its result, or its
+    exception. Tasks waiting on another loop's or a thread's call are woken
+    with call_soon_threadsafe. A call whose leader is cancelled is not an
+    outcome: its followers join again, and one of them runs the function.
+    Nothing is remembered once the call returns, so caching stays with the
+    caller, whose function should check its cache again before fetching.
+    """
+
+    def __init__(self):
+        self._calls: dict[K, _Call] = {}
+        self._lock = threading.Lock()
+        self._metrics = SingleFlightMetrics()
+
+    def _join(self, key: K, waiter: asyncio.Future | None = None) -> tuple[_Call, bool]:
+        loop = None if waiter is None else waiter.get_loop()
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call(loop)
+            elif waiter is not None:
+                call.waiters.append((loop, waiter))
+            self._metrics.calls += 1
+            if leader:
+                self._metrics.executions += 1
+            else:
+                self._metrics.coalesced += 1
+            return call, leader
+
+    def _finish(self, key: K, call: _Call) -> None:
+        with self._lock:
+            del self._calls[key]
+            call.done.set()
+            waiters, call.waiters = call.waiters, []
+        for loop, future in waiters:
+            try:
+                loop.call_soon_threadsafe(call.resolve, future)
+            except RuntimeError:
+                pass  # The follower's loop has closed.
+
+    def do(self, key: K, fn: Callable[[], V]) -> V:
+        while True:
+            call, leader = self._join(key)
+            if leader:
+                break
+            if call.loop is not None and call.loop is _running_loop():
+                raise RuntimeError(
+                    f"do({key!r}) would block the event loop running that call"
+                )
+            call.done.wait()
+            if not call.cancelled:
+                return call.outcome()
+
+        try:
+            call.result = fn()
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            self._finish(key, call)
+        return call.result
+
+    async def ado(self, key: K, fn: Callable[[], Awaitable[V]]) -> V:
+        # Each follower waits on a future of its own, so cancelling one does
+        # not cancel the shared call.
+        while True:
+            future = asyncio.get_running_loop().create_future()
+            call, leader = self._join(key, future)
+            if leader:
+                break
+            await future
+            if not call.cancelled:
+                return call.outcome()
+
+        try:
+            call.result = await fn()
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            self._finish(key, call)
+        return call.result
+
+    def metrics(self) -> SingleFlightMetrics:
+        with self._lock:
+            return self._metrics.model_copy(update={"in_flight": len(self._calls)})
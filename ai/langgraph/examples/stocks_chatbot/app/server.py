@@ -0,0 +1,138 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+import weakref
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.graph.state import CompiledStateGraph
+
+from app.resources.resources import resources
+from app.graph.graph import graph
+
+logger = logging.getLogger(__name__)
+
+
+class Overloaded(Exception):
+    pass
+
+
+class ChatServer:
+    """Serves many chat sessions from one compiled graph.
+
+    At most max_concurrency turns run at once and at most max_pending turns may
+    wait or run; further requests are rejected immediately instead of queueing
+    without bound. Turns of the same thread_id run one at a time, in order.
+    Each connection handles one request at a time, so a slow server also slows
+    down reading from its clients.
+
+    The protocol is newline-delimited JSON: {"thread_id": str, "content": str}
+    is answered with {"thread_id": str, "reply": str, "latency_ms": float} or
+    {"thread_id": str, "error": str}. A malformed request is a "bad request"
+    and a turn that fails in the graph an "internal error"; either way the
+    connection stays open for the next request.
+    """
+
+    def __init__(
+        self,
+        stocks_graph: CompiledStateGraph,
+        max_concurrency: int = 64,
+        max_pending: int = 1024,
+    ):
+        self.stocks_graph = stocks_graph
+        self.max_pending = max_pending
+        self.pending = 0
+        self._running = asyncio.Semaphore(max_concurrency)
+        self._thread_locks: weakref.WeakValueDictionary[str, asyncio.Lock] = (
+            weakref.WeakValueDictionary()
+        )
+
+    def _thread_lock(self, thread_id: str) -> asyncio.Lock:
+        lock = self._thread_locks.get(thread_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._thread_locks[thread_id] = lock
+        return lock
+
+    async def chat(self, thread_id: str, content: str) -> str:
+        if self.pending >= self.max_pending:
+            raise Overloaded(f"more than {self.max_pending} pending turns")
+
+        self.pending += 1
+        try:
+            async with self._thread_lock(thread_id), self._running:
+                state = await self.stocks_graph.ainvoke(
+                    {"messages": [{"role": "user", "content": content}]},
+                    RunnableConfig(configurable={"thread_id": thread_id}),
+                )
+            return state["messages"][-1].content
+        finally:
+            self.pending -= 1
+
+    async def handle_request(self, line: bytes) -> dict:
+        thread_id = None
+        start = time.perf_counter()
+        try:
+            request = json.loads(line)
+            thread_id, content = request["thread_id"], request["content"]
+            if not isinstance(thread_id, str) or not isinstance(content, str):
+                raise TypeError("thread_id and content must be strings")
+        except (ValueError, KeyError, TypeError) as error:
+            return {"thread_id": thread_id, "error": f"bad request: {error}"}
+
+        try:
+            reply = await self.chat(thread_id, content)
+        except Overloaded as error:
+            return {"thread_id": thread_id, "error": f"overloaded: {error}"}
+        except Exception:
+            logger.exception("turn of thread %s failed", thread_id)
+            return {"thread_id": thread_id, "error": "internal error"}
+        return {
+            "thread_id": thread_id,
+            "reply": reply,
+            "latency_ms": (time.perf_counter() - start) * 1000,
+        }
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        try:
+            while line := await reader.readline():
+                response = await self.handle_request(line)
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8000):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"Stocks chatbot listening on {host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+
+def __parse_args():
+    parser = argparse.ArgumentParser(description="Multi-session stocks chatbot server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-concurrency", type=int, default=64)
+    parser.add_argument("--max-pending", type=int, default=1024)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = __parse_args()
+    resources = resources(
+        checkpoint_db=os.getenv("STOCKS_CHATBOT_DB"),
+        bar_store_dir=os.getenv("STOCKS_CHATBOT_BARS"),
+        trace_path=os.getenv("STOCKS_CHATBOT_TRACE"),
+    )
+    server = ChatServer(graph(resources), args.max_concurrency, args.max_pending)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,81 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+from datetime import timedelta
+
+from app.resources.alpha_vantage import AlphaVantageResources
+from app.resources.bar_store import BarStore
+from app.resources.cache import TTLCache
+from app.resources.rate_limit import RateLimiter
+from benchmarks.fakes import FakeTimeSeries
+from benchmarks.stats import distribution
+
+
+def run_day(
+    bar_store: BarStore | None, refreshes: int, bars: int, symbols: list[str]
+) -> dict:
+    """Refetch every symbol once per new 15min bar, as over a trading day."""
+    time_series = FakeTimeSeries(bars=bars)
+    alpha_vantage = AlphaVantageResources(
+        time_series=time_series,
+        intraday_cache=TTLCache(ttl=0.0),
+        rate_limiter=RateLimiter(max_calls=1_000_000),
+        bar_store=bar_store,
+    )
+    fetches = []
+    for _ in range(refreshes):
+        time_series.end += timedelta(minutes=15)
+        for symbol in symbols:
+            start = time.perf_counter()
+            alpha_vantage.get_intraday(symbol, refresh=True)
+            fetches.append((time.perf_counter() - start) * 1000)
+
+    result = {"fetch_ms": distribution(fetches)}
+    if bar_store is not None:
+        result["stored_bars"] = {
+            symbol: len(bar_store.read(symbol, "15min")) for symbol in symbols
+        }
+        result["store_bytes"] = sum(
+            os.path.getsize(os.path.join(bar_store.root, name))
+            for name in os.listdir(bar_store.root)
+        )
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Per-fetch cost of intraday refreshes with and without the bar store."
+    )
+    parser.add_argument(
+        "--refreshes", type=int, default=26, help="new bars, 26 per trading day"
+    )
+    parser.add_argument(
+        "--bars", type=int, default=100, help="bars per provider response"
+    )
+    parser.add_argument("--symbols", default="AAPL,MSFT,GOOG,AMZN")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    symbols = args.symbols.split(",")
+    with tempfile.TemporaryDirectory() as directory:
+        report = {
+            "refreshes": args.refreshes,
+            "bars": args.bars,
+            "without_store": run_day(None, args.refreshes, args.bars, symbols),
+            "with_store": run_day(
+                BarStore(directory), args.refreshes, args.bars, symbols
+            ),
+        }
+
+    report = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(report)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from langchain_core.runnables import RunnableConfig
+
+from app.graph.graph import graph
+from app.resources.resources import resources
+from benchmarks.fakes import FakeTimeSeries, ScriptedChatModel
+from benchmarks.stats import rss_bytes
+
+
+def run(
+    saver: str, turns: int, threads: int, sample_every: int, keep_last: int
+) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        stocks_graph = graph(
+            resources(
+                chat_model=ScriptedChatModel(),
+                time_series=FakeTimeSeries(),
+                checkpoint_db=os.path.join(directory, "checkpoints.db")
+                if saver == "sqlite"
+                else None,
+                keep_last_checkpoints=keep_last,
+            )
+        )
+
+        samples = []
+        start = time.perf_counter()
+        for turn in range(1, turns + 1):
+            config = RunnableConfig(configurable={"thread_id": f"t{turn % threads}"})
+            stocks_graph.invoke(
+                {"messages": [{"role": "user", "content": f"turn {turn}"}]}, config
+            )
+            if turn % sample_every == 0:
+                samples.append(
+                    {
+                        "turn": turn,
+                        "seconds": time.perf_counter() - start,
+                        "rss_bytes": rss_bytes(),
+                    }
+                )
+
+    return {
+        "saver": saver,
+        "turns": turns,
+        "threads": threads,
+        "keep_last": keep_last if saver == "sqlite" else None,
+        "samples": samples,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Memory of the stocks chatbot over many turns per checkpointer."
+    )
+    parser.add_argument("--savers", default="memory,sqlite")
+    parser.add_argument("--turns", type=int, default=10_000)
+    parser.add_argument("--threads", type=int, default=100)
+    parser.add_argument("--sample-every", type=int, default=500)
+    parser.add_argument("--keep-last", type=int, default=20)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    savers = args.savers.split(",")
+    if len(savers) == 1:
+        result = run(
+            savers[0], args.turns, args.threads, args.sample_every, args.keep_last
+        )
+        print(json.dumps(result))
+        return
+
+    # One interpreter per saver so their RSS curves do not overlap.
+    results = []
+    for saver in savers:
+        command = [
+            sys.executable,
+            "-m",
+            "benchmarks.checkpoint_memory",
+            "--savers",
+            saver,
+        ]
+        for flag in ("turns", "threads", "sample_every", "keep_last"):
+            command += [f"--{flag.replace('_', '-')}", str(getattr(args, flag))]
+        output = subprocess.run(command, capture_output=True, text=True, check=True)
+        results.append(json.loads(output.stdout))
+
+    report = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(report)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import asyncio
+import itertools
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import Field, PrivateAttr
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Chat model that replies with the next message of a script, in a loop.
+
+    Scripted tool calls get fresh ids on every reply so turns never collide.
+    """
+
+    script: list[AIMessage] = Field(default_factory=lambda: [AIMessage("ok")])
+    latency: float = 0.0
+    _replies: itertools.count = PrivateAttr(default_factory=itertools.count)
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def _next_reply(self) -> AIMessage:
+        reply = next(self._replies)
+        message = self.script[reply % len(self.script)]
+        return message.model_copy(
+            update={
+                "tool_calls": [
+                    {**tool_call, "id": f"call_{reply}_{i}"}
+                    for i, tool_call in enumerate(message.tool_calls)
+                ]
+            }
+        )
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._next_reply())])
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._next_reply())])
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "ScriptedChatModel":
+        return self
+
+
+def tool_call(name: str, **args: Any) -> AIMessage:
+    return AIMessage("", tool_calls=[{"name": name, "args": args, "id": "scripted"}])
+
+
+def tool_calls(name: str, args: list[dict]) -> AIMessage:
+    """One reply that calls the same tool once per args, like a parallel call."""
+    return AIMessage(
+        "",
+        tool_calls=[{"name": name, "args": a, "id": "scripted"} for a in args],
+    )
+
+
+class FakeTimeSeries:
+    """Stands in for alpha_vantage's TimeSeries with synthetic random-walk bars."""
+
+    def __init__(
+        self,
+        bars: int = 100,
+        latency: float = 0.0,
+        seed: int = 0,
+        latencies: dict[str, float] | None = None,
+    ):
+        self.bars = bars
+        self.latency = latency
+        self.latencies = latencies or {}
+        self.end = datetime(2025, 5, 16, 19, 45)
+        self.seed = seed
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def get_intraday(
+        self, symbol: str, interval: str = "15min", **kwargs: Any
+    ) -> tuple[dict, dict]:
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latencies.get(symbol, self.latency))
+
+        rng = random.Random(f"{self.seed}:{symbol}")
+        minutes = int(interval.removesuffix("min"))
+        price = 100 + rng.random() * 100
+        data = {}
+        for i in range(self.bars, 0, -1):
+            open_price = price
+            price *= 1 + rng.gauss(0, 0.002)
+            timestamp = self.end - timedelta(minutes=minutes * (i - 1))
+            data[timestamp.strftime("%Y-%m-%d %H:%M:%S")] = {
+                "1. open": f"{open_price:.4f}",
+                "2. high": f"{max(open_price, price) * 1.001:.4f}",
+                "3. low": f"{min(open_price, price) * 0.999:.4f}",
+                "4. close": f"{price:.4f}",
+                "5. volume": str(rng.randint(1_000, 100_000)),
+            }
+        meta_data = {"2. Symbol": symbol, "4. Interval": interval}
+        return data, meta_data
@@ -0,0 +1,172 @@
+import argparse
+import json
+import threading
+import time
+import tracemalloc
+from typing import Any
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableConfig
+
+from app.graph.graph import graph
+from app.resources.resources import resources
+from benchmarks.fakes import FakeTimeSeries, ScriptedChatModel, tool_call
+from benchmarks.stats import distribution, rss_bytes
+
+
+class TimingHandler(BaseCallbackHandler):
+    """Adds up time spent in chat model calls and in tool calls."""
+
+    def __init__(self):
+        self.model_seconds = 0.0
+        self.tool_seconds = 0.0
+        self._starts: dict[UUID, float] = {}
+        self._lock = threading.Lock()
+
+    def _start(self, run_id: UUID) -> None:
+        with self._lock:
+            self._starts[run_id] = time.perf_counter()
+
+    def _elapsed(self, run_id: UUID) -> float:
+        with self._lock:
+            return time.perf_counter() - self._starts.pop(run_id, time.perf_counter())
+
+    def on_chat_model_start(
+        self, serialized: Any, messages: Any, *, run_id: UUID, **kwargs: Any
+    ):
+        self._start(run_id)
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any):
+        self.model_seconds += self._elapsed(run_id)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        self.model_seconds += self._elapsed(run_id)
+
+    def on_tool_start(
+        self, serialized: Any, input_str: str, *, run_id: UUID, **kwargs: Any
+    ):
+        self._start(run_id)
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any):
+        self.tool_seconds += self._elapsed(run_id)
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        self.tool_seconds += self._elapsed(run_id)
+
+
+def script(tool_every: int, symbols: list[str]) -> list[AIMessage]:
+    """One turn in tool_every calls get_intraday_data before answering."""
+    turns = []
+    for symbol in symbols:
+        turns += [
+            tool_call("get_intraday_data", symbol=symbol),
+            AIMessage(f"{symbol} looks fine."),
+        ]
+        turns += [AIMessage("ok")] * (tool_every - 1)
+    return turns
+
+
+def run(args: argparse.Namespace) -> dict:
+    stocks_graph = graph(
+        resources(
+            chat_model=ScriptedChatModel(
+                script=script(args.tool_every, args.symbols.split(",")),
+                latency=args.model_latency_ms / 1000,
+            ),
+            # Its own script, so summaries never consume the chat model's replies.
+            summary_model=ScriptedChatModel(
+                script=[AIMessage("The user asked about a few symbols.")],
+                latency=args.model_latency_ms / 1000,
+            ),
+            history_token_budget=args.history_token_budget,
+            time_series=FakeTimeSeries(latency=args.provider_latency_ms / 1000),
+            intraday_ttl=args.cache_ttl,
+            requests_per_minute=1_000_000,
+            trace_path=args.trace,
+        )
+    )
+    config = RunnableConfig(configurable={"thread_id": "benchmark"})
+    stocks_graph.update_state(config, {"favorite_symbol": "AAPL"})
+
+    totals, models, tools, overheads = [], [], [], []
+    memory = []
+    if args.trace_memory:
+        tracemalloc.start()
+    for turn in range(1, args.turns + 1):
+        handler = TimingHandler()
+        start = time.perf_counter()
+        stocks_graph.invoke(
+            {"messages": [{"role": "user", "content": f"turn {turn}"}]},
+            {**config, "callbacks": [handler]},
+        )
+        total = time.perf_counter() - start
+
+        totals.append(total * 1000)
+        models.append(handler.model_seconds * 1000)
+        tools.append(handler.tool_seconds * 1000)
+        overheads.append((total - handler.model_seconds - handler.tool_seconds) * 1000)
+        if turn % args.sample_every == 0:
+            sample = {"turn": turn, "rss_bytes": rss_bytes()}
+            if args.trace_memory:
+                sample["traced_bytes"] = tracemalloc.get_traced_memory()[0]
+            memory.append(sample)
+
+    return {
+        "turns": args.turns,
+        "tool_every": args.tool_every,
+        "model_latency_ms": args.model_latency_ms,
+        "provider_latency_ms": args.provider_latency_ms,
+        "cache_ttl": args.cache_ttl,
+        "history_token_budget": args.history_token_budget,
+        "turn_ms": distribution(totals),
+        "model_ms": distribution(models),
+        "tool_ms": distribution(tools),
+        "graph_overhead_ms": distribution(overheads),
+        "memory": memory,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Offline per-turn latency and memory benchmark of the stocks graph."
+    )
+    parser.add_argument("--turns", type=int, default=1000)
+    parser.add_argument(
+        "--tool-every", type=int, default=3, help="one turn in N calls a tool"
+    )
+    parser.add_argument("--symbols", default="AAPL,MSFT,GOOG,AMZN")
+    parser.add_argument("--model-latency-ms", type=float, default=0.0)
+    parser.add_argument("--provider-latency-ms", type=float, default=0.0)
+    parser.add_argument(
+        "--cache-ttl", type=float, default=0.0, help="0 fetches on every tool call"
+    )
+    parser.add_argument(
+        "--history-token-budget",
+        type=int,
+        default=4000,
+        help="prompt window before older turns are summarized",
+    )
+    parser.add_argument("--sample-every", type=int, default=100)
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="also record tracemalloc bytes (slower)",
+    )
+    parser.add_argument(
+        "--trace", default=None, help="also write spans to this JSONL file"
+    )
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    report = json.dumps(run(args), indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(report)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import argparse
+import asyncio
+import json
+import time
+
+from app.graph.graph import graph
+from app.resources.resources import resources
+from app.server import ChatServer
+from benchmarks.fakes import FakeTimeSeries, ScriptedChatModel
+from benchmarks.stats import distribution
+
+
+async def session(
+    host: str, port: int, thread_id: str, turns: int, latencies: list, errors: list
+):
+    reader, writer = await asyncio.open_connection(host, port)
+    for turn in range(turns):
+        request = {"thread_id": thread_id, "content": f"message {turn}"}
+        start = time.perf_counter()
+        writer.write(json.dumps(request).encode() + b"\n")
+        await writer.drain()
+        response = json.loads(await reader.readline())
+        if "error" in response:
+            errors.append(response["error"])
+        else:
+            latencies.append((time.perf_counter() - start) * 1000)
+    writer.close()
+    await writer.wait_closed()
+
+
+async def run(args: argparse.Namespace) -> dict:
+    stocks_graph = graph(
+        resources(
+            chat_model=ScriptedChatModel(latency=args.model_latency_ms / 1000),
+            time_series=FakeTimeSeries(),
+        )
+    )
+    server = ChatServer(stocks_graph, args.max_concurrency, args.max_pending)
+    tcp_server = await asyncio.start_server(server.handle_connection, args.host, 0)
+    port = tcp_server.sockets[0].getsockname()[1]
+
+    latencies: list[float] = []
+    errors: list[str] = []
+    start = time.perf_counter()
+    async with tcp_server:
+        await asyncio.gather(
+            *(
+                session(args.host, port, f"session-{i}", args.turns, latencies, errors)
+                for i in range(args.sessions)
+            )
+        )
+    elapsed = time.perf_counter() - start
+
+    return {
+        "sessions": args.sessions,
+        "turns_per_session": args.turns,
+        "max_concurrency": args.max_concurrency,
+        "max_pending": args.max_pending,
+        "model_latency_ms": args.model_latency_ms,
+        "seconds": elapsed,
+        "completed": len(latencies),
+        "rejected": len(errors),
+        "turns_per_second": len(latencies) / elapsed,
+        "latency_ms": distribution(latencies),
+    }
+
+
+async def scaling(args: argparse.Namespace, baseline_concurrency: int) -> dict:
+    """Compare the throughput at max_concurrency with that at baseline_concurrency.
+
+    Turns mostly wait on the model, so throughput should grow with the turns in
+    flight until the CPU saturates. The check passes when the speedup reaches a
+    quarter of the ideal one, which leaves room for graph overhead on small
+    machines but fails when something serializes the turns.
+    """
+    baseline = await run(
+        argparse.Namespace(**{**vars(args), "max_concurrency": baseline_concurrency})
+    )
+    full = await run(args)
+    ideal = min(args.max_concurrency, args.sessions) / baseline_concurrency
+    speedup = full["turns_per_second"] / baseline["turns_per_second"]
+    return {
+        "baseline": baseline,
+        "full": full,
+        "ideal_speedup": ideal,
+        "speedup": speedup,
+        "scales": speedup >= ideal / 4,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Load test the chat server with a fake chat model."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--max-concurrency", type=int, default=64)
+    parser.add_argument("--max-pending", type=int, default=1024)
+    parser.add_argument("--model-latency-ms", type=float, default=50.0)
+    parser.add_argument(
+        "--check-scaling",
+        type=int,
+        metavar="BASELINE_CONCURRENCY",
+        help="also run at this concurrency and fail unless throughput scales",
+    )
+    args = parser.parse_args()
+    if args.check_scaling is None:
+        print(json.dumps(asyncio.run(run(args)), indent=2))
+        return
+    result = asyncio.run(scaling(args, args.check_scaling))
+    print(json.dumps(result, indent=2))
+    if not result["scales"]:
+        raise SystemExit(
+            f"throughput grew {result['speedup']:.1f}x from concurrency "
+            f"{args.check_scaling} to {args.max_concurrency}, expected at least "
+            f"{result['ideal_speedup'] / 4:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
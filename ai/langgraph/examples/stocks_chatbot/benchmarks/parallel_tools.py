@@ -0,0 +1,96 @@
+import argparse
+import asyncio
+import json
+import time
+
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
+
+from app.graph.graph import graph
+from app.resources.resources import resources
+from benchmarks.fakes import FakeTimeSeries, ScriptedChatModel, tool_calls
+from benchmarks.stats import distribution
+
+
+def parse_latencies(value: str) -> dict[str, float]:
+    latencies = {}
+    for item in value.split(","):
+        symbol, latency_ms = item.split("=")
+        latencies[symbol] = float(latency_ms) / 1000
+    return latencies
+
+
+def run(args: argparse.Namespace) -> dict:
+    latencies = parse_latencies(args.latencies_ms)
+    stocks_graph = graph(
+        resources(
+            chat_model=ScriptedChatModel(
+                script=[
+                    tool_calls("get_intraday_data", [{"symbol": s} for s in latencies]),
+                    AIMessage("Compared."),
+                ]
+            ),
+            time_series=FakeTimeSeries(latencies=latencies),
+            intraday_ttl=0.0,
+            requests_per_minute=1_000_000,
+            tool_workers=args.tool_workers,
+            tool_timeout=args.tool_timeout,
+        )
+    )
+    config = RunnableConfig(configurable={"thread_id": "benchmark"})
+    stocks_graph.update_state(config, {"favorite_symbol": "AAPL"})
+
+    turns, timeouts = [], 0
+    for turn in range(1, args.turns + 1):
+        turn_input = {"messages": [{"role": "user", "content": f"turn {turn}"}]}
+        start = time.perf_counter()
+        if args.use_async:
+            state = asyncio.run(stocks_graph.ainvoke(turn_input, config))
+        else:
+            state = stocks_graph.invoke(turn_input, config)
+        turns.append((time.perf_counter() - start) * 1000)
+
+        timeouts += sum(
+            isinstance(m, ToolMessage) and "took longer" in str(m.content)
+            for m in state["messages"][-len(latencies) - 1 :]
+        )
+
+    return {
+        "turns": args.turns,
+        "async": args.use_async,
+        "tool_workers": args.tool_workers,
+        "tool_timeout": args.tool_timeout,
+        "latencies_ms": {s: latency * 1000 for s, latency in latencies.items()},
+        "sequential_ms": sum(latencies.values()) * 1000,
+        "slowest_call_ms": max(latencies.values()) * 1000,
+        "turn_ms": distribution(turns),
+        "timed_out_calls": timeouts,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Turn latency when one reply makes several slow tool calls."
+    )
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument(
+        "--latencies-ms",
+        default="AAPL=100,MSFT=200,GOOG=300,AMZN=400",
+        help="comma-separated SYMBOL=provider latency",
+    )
+    parser.add_argument("--tool-workers", type=int, default=4)
+    parser.add_argument("--tool-timeout", type=float, default=30.0)
+    parser.add_argument("--async", dest="use_async", action="store_true")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    report = json.dumps(run(args), indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(report)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# What app.main imported before the graph was built in the background.
+EAGER_IMPORTS = (
+    "import langchain_core.messages, langgraph.graph.state, alpha_vantage.timeseries, "
+    "langchain.chat_models, langchain_google_genai, app.graph.graph, "
+    "app.resources.resources"
+)
+
+
+def time_to_prompt() -> float:
+    """Seconds from spawning app.main until it asks for the first input."""
+    start = time.perf_counter()
+    chat = subprocess.Popen(
+        [sys.executable, "-u", "-m", "app.main"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+    output = b""
+    while not output.endswith(b"User: "):
+        byte = chat.stdout.read(1)
+        if not byte:
+            raise RuntimeError(f"app.main exited before prompting: {output!r}")
+        output += byte
+    elapsed = time.perf_counter() - start
+    chat.communicate(b"q\n")
+    return elapsed
+
+
+def time_command(code: str) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], check=True)
+    return time.perf_counter() - start
+
+
+def slowest_imports(code: str, top: int) -> list[dict]:
+    """Cumulative import times reported by python -X importtime, slowest first."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        imports.append({"module": name.strip(), "ms": int(cumulative) / 1000})
+    return sorted(imports, key=lambda item: item["ms"], reverse=True)[:top]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Cold start of the stocks chatbot: time to the first prompt."
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    # Keep stray sessions from touching a real checkpoint, bar store or trace.
+    for name in ("STOCKS_CHATBOT_DB", "STOCKS_CHATBOT_BARS", "STOCKS_CHATBOT_TRACE"):
+        os.environ.pop(name, None)
+
+    prompt = [time_to_prompt() * 1000 for _ in range(args.repeat)]
+    eager = [time_command(EAGER_IMPORTS) * 1000 for _ in range(args.repeat)]
+    report = json.dumps(
+        {
+            "repeat": args.repeat,
+            "time_to_prompt_ms": statistics.median(prompt),
+            "eager_imports_ms": statistics.median(eager),
+            "slowest_main_imports": slowest_imports("import app.main", args.top),
+            "slowest_graph_imports": slowest_imports(EAGER_IMPORTS, args.top),
+        },
+        indent=2,
+    )
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(report)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import os
+from datetime import timedelta
+
+import numpy as np
+import pytest
+
+from app.resources.bar_store import BAR_DTYPE, BarStore
+from benchmarks.fakes import FakeTimeSeries
+
+
+def advance(time_series: FakeTimeSeries, bars: int) -> dict:
+    """The next compact window, bars newer than the previous one."""
+    time_series.end += timedelta(minutes=15 * bars)
+    data, _ = time_series.get_intraday("AAPL", "15min")
+    return data
+
+
+def test_appends_store_only_bars_newer_than_the_last_one(tmp_path) -> None:
+    time_series = FakeTimeSeries(bars=100)
+    store = BarStore(str(tmp_path))
+    data, _ = time_series.get_intraday("AAPL", "15min")
+
+    assert store.append("AAPL", "15min", data) == 100
+    assert store.append("AAPL", "15min", data) == 0
+    newer = advance(time_series, 7)
+    assert store.append("aapl", "15min", newer) == 7
+
+    bars = store.read("AAPL", "15min")
+    assert len(bars) == 107
+    assert (np.diff(bars.timestamps.astype("<i8")) > 0).all()
+    assert store.last_timestamp("AAPL", "15min") == max(newer)
+    assert bars.close[-1] == float(newer[max(newer)]["4. close"])
+
+
+def test_a_torn_record_is_dropped_and_overwritten(tmp_path) -> None:
+    time_series = FakeTimeSeries(bars=100)
+    data, _ = time_series.get_intraday("AAPL", "15min")
+    BarStore(str(tmp_path)).append("AAPL", "15min", data)
+    path = tmp_path / "AAPL-15min.bars"
+    # A crash in the middle of a write leaves part of a record behind.
+    with open(path, "ab") as file:
+        file.write(b"\0" * (BAR_DTYPE.itemsize // 2))
+
+    store = BarStore(str(tmp_path))
+    assert len(store.read("AAPL", "15min")) == 100
+    assert store.append("AAPL", "15min", advance(time_series, 3)) == 3
+    assert os.path.getsize(path) == 103 * BAR_DTYPE.itemsize
+    assert len(store.read("AAPL", "15min")) == 103
+
+
+def test_views_stay_valid_after_appends(tmp_path) -> None:
+    time_series = FakeTimeSeries(bars=100)
+    store = BarStore(str(tmp_path))
+    data, _ = time_series.get_intraday("AAPL", "15min")
+    store.append("AAPL", "15min", data)
+
+    before = store.read("AAPL", "15min", limit=10)
+    close, timestamps = before.close.copy(), before.timestamps.copy()
+    store.append("AAPL", "15min", advance(time_series, 5))
+    after = store.read("AAPL", "15min", limit=10)
+
+    assert (before.close == close).all()
+    assert (before.timestamps == timestamps).all()
+    assert (after.timestamps[:5] == timestamps[5:]).all()
+    assert after.timestamps[-1] > timestamps[-1]
+
+
+@pytest.mark.parametrize(
+    "symbol, interval",
+    [("../AAPL", "15min"), ("AAPL/X", "15min"), ("", "15min"), ("AAPL", "../15min")],
+)
+def test_invalid_names_are_rejected_before_touching_files(
+    tmp_path, symbol: str, interval: str
+) -> None:
+    store = BarStore(str(tmp_path / "bars"))
+    data, _ = FakeTimeSeries(bars=10).get_intraday("AAPL", "15min")
+
+    with pytest.raises(ValueError):
+        store.append(symbol, interval, data)
+    with pytest.raises(ValueError):
+        store.read(symbol, interval)
+    assert os.listdir(tmp_path) == ["bars"]
+    assert os.listdir(tmp_path / "bars") == []
+
+
+def test_symbols_with_dots_and_dashes_are_valid(tmp_path) -> None:
+    store = BarStore(str(tmp_path))
+    data, _ = FakeTimeSeries(bars=10).get_intraday("BRK.B", "15min")
+
+    assert store.append("brk.b", "15min", data) == 10
+    assert len(store.read("BRK.B", "15min")) == 10
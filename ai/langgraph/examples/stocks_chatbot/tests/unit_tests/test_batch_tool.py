@@ -0,0 +1,83 @@
+import asyncio
+
+import httpx
+
+from app.graph.tool_limits import with_limits
+from app.graph.tools import tools
+from app.resources.alpha_vantage import AlphaVantageResources
+from app.resources.intraday_client import AsyncIntradayClient
+from app.resources.rate_limit import RateLimiter
+from benchmarks.fakes import FakeTimeSeries
+
+SYMBOLS = ["AAPL", "MSFT", "GOOG", "AMZN"]
+
+
+class FakeAlphaVantage(AlphaVantageResources):
+    """Serves the parallel path from FakeTimeSeries instead of the HTTP API."""
+
+    def async_client(self) -> AsyncIntradayClient:
+        def handle(request: httpx.Request) -> httpx.Response:
+            params = request.url.params
+            data, meta_data = self.time_series.get_intraday(
+                params["symbol"], params["interval"]
+            )
+            return httpx.Response(
+                200,
+                json={
+                    "Meta Data": meta_data,
+                    f"Time Series ({params['interval']})": data,
+                },
+            )
+
+        return AsyncIntradayClient(
+            rate_limiter=self.rate_limiter,
+            max_concurrency=self.max_concurrency,
+            transport=httpx.MockTransport(handle),
+        )
+
+
+def fake_alpha_vantage(requests_per_minute: int) -> FakeAlphaVantage:
+    return FakeAlphaVantage(
+        time_series=FakeTimeSeries(),
+        rate_limiter=RateLimiter(max_calls=requests_per_minute),
+    )
+
+
+def test_symbols_over_the_rate_limit_time_out_alone() -> None:
+    alpha_vantage = fake_alpha_vantage(requests_per_minute=2)
+
+    results = asyncio.run(alpha_vantage.aget_intraday_many(SYMBOLS, timeout=0.2))
+
+    fetched = [
+        symbol for symbol in SYMBOLS if not isinstance(results[symbol], Exception)
+    ]
+    timed_out = [
+        symbol for symbol in SYMBOLS if isinstance(results[symbol], TimeoutError)
+    ]
+    assert len(fetched) == 2 and len(timed_out) == 2
+    for symbol in fetched:
+        assert alpha_vantage.intraday_cache.get((symbol, "15min")) is results[symbol]
+    # The cancelled symbols gave their rate limit slots back.
+    assert 59.0 < alpha_vantage.rate_limiter.reserve() <= 60.0
+
+
+def test_batch_tool_answers_with_partial_results() -> None:
+    alpha_vantage = fake_alpha_vantage(requests_per_minute=2)
+    (batch_tool,) = with_limits(
+        [
+            tool
+            for tool in tools(alpha_vantage, batch_timeout=0.2)
+            if tool.name == "get_intraday_data_batch"
+        ],
+        timeout=1.0,
+    )
+
+    response = batch_tool.invoke({"symbols": SYMBOLS})
+    again = asyncio.run(batch_tool.ainvoke({"symbols": SYMBOLS}))
+
+    assert isinstance(response, dict)
+    assert sum("rate limited" in str(summary) for summary in response.values()) == 2
+    # The symbols fetched before are answered from the cache, the others wait
+    # for the same two slots again.
+    assert sum("rate limited" in str(summary) for summary in again.values()) == 2
+    assert alpha_vantage.time_series.calls == 2
@@ -0,0 +1,59 @@
+from app.resources.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_entries_expire_ttl_seconds_after_being_set() -> None:
+    clock = FakeClock()
+    cache = TTLCache(ttl=10.0, clock=clock)
+    cache.set("AAPL", "bars")
+
+    clock.now = 9.9
+    assert cache.get("AAPL") == "bars"
+    clock.now = 10.0
+    assert cache.get("AAPL") is None
+
+    metrics = cache.metrics()
+    assert (metrics.hits, metrics.misses, metrics.expirations) == (1, 1, 1)
+    assert metrics.size == 0
+
+
+def test_setting_again_renews_the_ttl() -> None:
+    clock = FakeClock()
+    cache = TTLCache(ttl=10.0, clock=clock)
+    cache.set("AAPL", "old")
+    clock.now = 8.0
+    cache.set("AAPL", "new")
+
+    clock.now = 15.0
+    assert cache.get("AAPL") == "new"
+    assert cache.ttl_left("AAPL") == 3.0
+
+
+def test_least_recently_used_entry_is_evicted_first() -> None:
+    cache = TTLCache(max_size=2, clock=FakeClock())
+    cache.set("AAPL", 1)
+    cache.set("MSFT", 2)
+    # Reading AAPL makes MSFT the least recently used entry.
+    assert cache.get("AAPL") == 1
+    cache.set("GOOG", 3)
+
+    assert cache.get("MSFT") is None
+    assert (cache.get("AAPL"), cache.get("GOOG")) == (1, 3)
+    metrics = cache.metrics()
+    assert (metrics.evictions, metrics.size) == (1, 2)
+
+
+def test_misses_of_absent_keys_are_counted() -> None:
+    cache = TTLCache(clock=FakeClock())
+
+    assert cache.get("AAPL") is None
+    assert cache.ttl_left("AAPL") == 0.0
+    metrics = cache.metrics()
+    assert (metrics.hits, metrics.misses, metrics.expirations) == (0, 1, 0)
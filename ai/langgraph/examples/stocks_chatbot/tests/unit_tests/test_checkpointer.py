@@ -0,0 +1,131 @@
+import asyncio
+
+from langgraph.checkpoint.base import CheckpointTuple
+
+from app.graph.graph import graph
+from app.resources.checkpointer import PruningSqliteSaver
+from app.resources.resources import resources
+from benchmarks.fakes import FakeTimeSeries, ScriptedChatModel
+
+
+def chat(tmp_path, **retention):
+    stocks_resources = resources(
+        chat_model=ScriptedChatModel(),
+        time_series=FakeTimeSeries(),
+        checkpoint_db=str(tmp_path / "checkpoints.db"),
+        **retention,
+    )
+    return graph(stocks_resources), stocks_resources.memory
+
+
+def turn_input(turn: int) -> dict:
+    return {"messages": [{"role": "user", "content": f"message {turn}"}]}
+
+
+def config(thread_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def count(saver: PruningSqliteSaver, table: str, thread_id: str) -> int:
+    with saver.cursor(transaction=False) as cur:
+        return cur.execute(
+            f"SELECT COUNT(*) FROM {table} WHERE thread_id = ?", (thread_id,)
+        ).fetchone()[0]
+
+
+def orphan_writes(saver: PruningSqliteSaver) -> int:
+    with saver.cursor(transaction=False) as cur:
+        return cur.execute(
+            """
+            SELECT COUNT(*) FROM writes w WHERE NOT EXISTS (
+                SELECT 1 FROM checkpoints c
+                WHERE c.thread_id = w.thread_id
+                AND c.checkpoint_ns = w.checkpoint_ns
+                AND c.checkpoint_id = w.checkpoint_id
+            )
+            """
+        ).fetchone()[0]
+
+
+def test_only_the_last_checkpoints_of_a_thread_are_kept(tmp_path) -> None:
+    stocks_graph, saver = chat(tmp_path, keep_last_checkpoints=3)
+
+    for turn in range(5):
+        stocks_graph.invoke(turn_input(turn), config("t1"))
+    stocks_graph.invoke(turn_input(0), config("t2"))
+
+    assert count(saver, "checkpoints", "t1") == 3
+    assert count(saver, "checkpoint_times", "t1") == 3
+    assert orphan_writes(saver) == 0
+    # Pruning one thread leaves the other alone.
+    assert count(saver, "checkpoints", "t2") == 3
+    # The latest checkpoint still holds the whole conversation.
+    messages = stocks_graph.get_state(config("t1")).values["messages"]
+    assert len(messages) == 10
+
+
+def test_without_keep_last_every_checkpoint_is_kept(tmp_path) -> None:
+    stocks_graph, saver = chat(tmp_path, keep_last_checkpoints=None)
+
+    for turn in range(5):
+        stocks_graph.invoke(turn_input(turn), config("t1"))
+
+    # An input checkpoint and one per step, for each turn.
+    assert count(saver, "checkpoints", "t1") > 10
+
+
+def test_threads_idle_longer_than_max_age_are_swept(tmp_path) -> None:
+    stocks_graph, saver = chat(tmp_path, max_checkpoint_age=3600.0)
+    for thread_id in ("old", "new"):
+        stocks_graph.invoke(turn_input(0), config(thread_id))
+    with saver.cursor() as cur:
+        cur.execute(
+            "UPDATE checkpoint_times SET created_at = created_at - 7200 "
+            "WHERE thread_id = 'old'"
+        )
+
+    saver.sweep()
+
+    for table in ("checkpoints", "writes", "checkpoint_times"):
+        assert count(saver, table, "old") == 0
+        assert count(saver, table, "new") > 0
+    assert stocks_graph.get_state(config("old")).values == {}
+
+
+def test_sweeps_run_every_sweep_every_writes(tmp_path) -> None:
+    stocks_graph, saver = chat(tmp_path, max_checkpoint_age=0.0)
+    saver.sweep_every = 1_000
+
+    stocks_graph.invoke(turn_input(0), config("t1"))
+    assert count(saver, "checkpoints", "t1") > 0
+
+    saver.sweep_every = 1
+    stocks_graph.invoke(turn_input(0), config("t2"))
+    # With max_age 0 every sweep drops everything written before it.
+    assert count(saver, "checkpoints", "t1") == 0
+
+
+def test_the_database_is_in_wal_mode(tmp_path) -> None:
+    _, saver = chat(tmp_path)
+
+    with saver.cursor(transaction=False) as cur:
+        assert cur.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_async_turns_are_checkpointed_and_pruned(tmp_path) -> None:
+    stocks_graph, saver = chat(tmp_path, keep_last_checkpoints=3)
+
+    async def __main() -> tuple[CheckpointTuple, list[CheckpointTuple]]:
+        for turn in range(5):
+            await stocks_graph.ainvoke(turn_input(turn), config("t1"))
+        latest = await saver.aget_tuple(config("t1"))
+        listed = [checkpoint async for checkpoint in saver.alist(config("t1"))]
+        return latest, listed
+
+    latest, listed = asyncio.run(__main())
+
+    assert len(latest.checkpoint["channel_values"]["messages"]) == 10
+    assert len(listed) == 3
+    assert listed[0].config == latest.config
+    assert count(saver, "checkpoints", "t1") == 3
+    assert orphan_writes(saver) == 0
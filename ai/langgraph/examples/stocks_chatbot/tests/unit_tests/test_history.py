@@ -0,0 +1,50 @@
+from langchain_core.messages import AIMessage, HumanMessage, RemoveMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.runnables import RunnableLambda
+
+from app.graph.history import prompt_window
+
+
+def run_turns(turns: int, token_budget: int, low_watermark: int | None = None):
+    """Chat for turns turns, applying the updates like the graph's reducer."""
+    calls = []
+
+    def summarize(prompt):
+        calls.append(prompt)
+        return AIMessage(f"summary {len(calls)}")
+
+    summary_model = RunnableLambda(summarize)
+    messages, summary, prompt_tokens = [], "", []
+    for turn in range(turns):
+        messages.append(HumanMessage("How is AAPL doing today? " * 5, id=f"h{turn}"))
+        prompt, updates = prompt_window(
+            messages, summary, summary_model, token_budget, low_watermark
+        )
+        prompt_tokens.append(count_tokens_approximately(prompt))
+        removed = {
+            update.id
+            for update in updates.get("messages", [])
+            if isinstance(update, RemoveMessage)
+        }
+        messages = [message for message in messages if message.id not in removed]
+        summary = updates.get("summary", summary)
+        messages.append(AIMessage("AAPL is up 1.2% at 190.5. " * 5, id=f"a{turn}"))
+    return len(calls), prompt_tokens
+
+
+def test_history_within_budget_is_not_summarized() -> None:
+    calls, _ = run_turns(turns=3, token_budget=10_000)
+    assert calls == 0
+
+
+def test_summarization_is_occasional() -> None:
+    turns, token_budget = 60, 1000
+
+    calls, prompt_tokens = run_turns(turns, token_budget)
+    # Without hysteresis the window sits at the budget and folds most turns.
+    every_turn, _ = run_turns(turns, token_budget, low_watermark=token_budget)
+
+    assert every_turn > turns // 2
+    assert 0 < calls < every_turn // 4
+    # The summary message aside, the prompt stays within the budget.
+    assert max(prompt_tokens) <= token_budget + 50
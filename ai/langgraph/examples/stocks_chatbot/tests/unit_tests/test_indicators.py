@@ -0,0 +1,123 @@
+from datetime import timedelta
+
+import numpy as np
+import pytest
+
+from app.resources.alpha_vantage import AlphaVantageResources
+from app.resources.bars import FIELDS, IntradayBars
+from app.resources.cache import TTLCache
+from app.resources.indicators import IndicatorEngine, IndicatorSnapshot
+from app.resources.rate_limit import RateLimiter
+from benchmarks.fakes import FakeTimeSeries
+
+
+def recompute(bars: IntradayBars, sma_period=20, ema_period=20, rsi_period=14):
+    """Indicators of the whole series, computed from scratch."""
+    close = bars.close
+    sma = close[-sma_period:].mean() if len(close) >= sma_period else None
+
+    ema = close[0]
+    for price in close[1:]:
+        ema += 2 / (ema_period + 1) * (price - ema)
+
+    changes = np.diff(close)
+    rsi = None
+    if len(changes) >= rsi_period:
+        gains, losses = np.maximum(changes, 0), np.maximum(-changes, 0)
+        avg_gain, avg_loss = gains[:rsi_period].mean(), losses[:rsi_period].mean()
+        for gain, loss in zip(gains[rsi_period:], losses[rsi_period:]):
+            avg_gain += (gain - avg_gain) / rsi_period
+            avg_loss += (loss - avg_loss) / rsi_period
+        rsi = 100.0 if not avg_loss else 100 - 100 / (1 + avg_gain / avg_loss)
+
+    days = bars.timestamps.astype("datetime64[D]")
+    today = days == days[-1]
+    typical_price = (bars.high + bars.low + bars.close)[today] / 3
+    vwap = (typical_price * bars.volume[today]).sum() / bars.volume[today].sum()
+    return {"sma": sma, "ema": ema, "rsi": rsi, "vwap": vwap}
+
+
+def assert_matches(snapshot: IndicatorSnapshot, bars: IntradayBars) -> None:
+    expected = recompute(bars)
+    assert snapshot.bars == len(bars)
+    assert snapshot.last_close == pytest.approx(bars.close[-1], abs=1e-4)
+    for name, value in expected.items():
+        assert getattr(snapshot, name) == pytest.approx(value, abs=1e-4), name
+
+
+def series(count: int, seed: int = 0) -> IntradayBars:
+    """A fixed random walk of 15min bars spanning a few trading days."""
+    rng = np.random.default_rng(seed)
+    start = np.datetime64("2025-05-14T13:30:00")
+    timestamps = start + np.arange(count) * np.timedelta64(15, "m")
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, count)))
+    return IntradayBars(
+        symbol="AAPL",
+        interval="15min",
+        timestamps=timestamps.astype("datetime64[s]"),
+        open=close,
+        high=close * 1.001,
+        low=close * 0.999,
+        close=close,
+        volume=rng.integers(1_000, 100_000, count).astype(np.float64),
+    )
+
+
+def window(bars: IntradayBars, start: int, stop: int) -> IntradayBars:
+    return IntradayBars(
+        symbol=bars.symbol,
+        interval=bars.interval,
+        timestamps=bars.timestamps[start:stop],
+        **{field: getattr(bars, field)[start:stop] for field in FIELDS},
+    )
+
+
+def test_overlapping_windows_match_a_full_recomputation() -> None:
+    bars = series(300)
+    engine = IndicatorEngine()
+
+    for start, stop in [(0, 100), (0, 100), (40, 140), (100, 200), (150, 300)]:
+        snapshot = engine.update(window(bars, start, stop))
+        assert_matches(snapshot, window(bars, 0, stop))
+
+
+def test_short_series_has_no_sma_or_rsi_yet() -> None:
+    snapshot = IndicatorEngine().update(series(10))
+
+    assert snapshot.bars == 10
+    assert snapshot.sma is None and snapshot.rsi is None
+    assert snapshot.ema is not None and snapshot.vwap is not None
+
+
+def test_appends_after_a_cache_hit_match_a_full_recomputation() -> None:
+    time_series = FakeTimeSeries(bars=100)
+    alpha_vantage = AlphaVantageResources(
+        time_series=time_series,
+        intraday_cache=TTLCache(ttl=3600.0),
+        rate_limiter=RateLimiter(max_calls=1_000),
+    )
+
+    first = alpha_vantage.get_intraday("AAPL")
+    alpha_vantage.get_indicators("AAPL")
+    # A cache hit hands back the same bars and must not feed them twice.
+    assert alpha_vantage.get_intraday("AAPL") is first
+    assert_matches(alpha_vantage.get_indicators("AAPL"), first)
+    assert time_series.calls == 1
+
+    time_series.end += timedelta(minutes=15 * 7)
+    second = alpha_vantage.get_intraday("AAPL", refresh=True)
+    newer = second.timestamps > first.timestamps[-1]
+    seen = IntradayBars(
+        symbol="AAPL",
+        interval="15min",
+        timestamps=np.concatenate([first.timestamps, second.timestamps[newer]]),
+        **{
+            field: np.concatenate(
+                [getattr(first, field), getattr(second, field)[newer]]
+            )
+            for field in FIELDS
+        },
+    )
+
+    assert newer.sum() == 7
+    assert_matches(alpha_vantage.get_indicators("AAPL"), seen)
@@ -0,0 +1,119 @@
+import time
+
+from app.resources.alpha_vantage import AlphaVantageResources
+from app.resources.cache import TTLCache
+from app.resources.prefetch import FavoritePrefetcher
+from app.resources.rate_limit import RateLimiter
+from benchmarks.fakes import FakeTimeSeries
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def wait_until(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.001)
+    return condition()
+
+
+def tick(prefetcher: FavoritePrefetcher, clock: FakeClock, seconds: float) -> None:
+    """Advance the clock and wake the prefetcher, which waits in real time."""
+    clock.now += seconds
+    prefetcher._wake.set()
+
+
+def prefetcher_for(
+    clock: FakeClock, max_calls: int = 1_000, **kwargs
+) -> FavoritePrefetcher:
+    alpha_vantage = AlphaVantageResources(
+        time_series=FakeTimeSeries(),
+        intraday_cache=TTLCache(ttl=60.0, clock=clock),
+        rate_limiter=RateLimiter(max_calls=max_calls, clock=clock),
+    )
+    return FavoritePrefetcher(alpha_vantage, interval=240.0, clock=clock, **kwargs)
+
+
+def test_watched_symbols_are_refreshed_every_interval() -> None:
+    clock = FakeClock()
+    prefetcher = prefetcher_for(clock)
+    time_series = prefetcher.alpha_vantage.time_series
+
+    prefetcher.watch("t1", "aapl")
+    prefetcher.watch("t2", "AAPL")
+    assert wait_until(lambda: prefetcher.metrics().refreshes == 1)
+
+    tick(prefetcher, clock, 239.0)
+    time.sleep(0.05)
+    assert prefetcher.metrics().refreshes == 1
+
+    tick(prefetcher, clock, 1.0)
+    assert wait_until(lambda: prefetcher.metrics().refreshes == 2)
+    # Both sessions share the symbol, so it is fetched once per interval.
+    assert time_series.calls == 2
+    assert prefetcher.metrics().sessions == 2
+    assert prefetcher.metrics().symbols == 1
+
+
+def test_idle_sessions_expire_and_the_thread_exits() -> None:
+    clock = FakeClock()
+    prefetcher = prefetcher_for(clock, idle_timeout=900.0)
+
+    prefetcher.watch("t1", "AAPL")
+    prefetcher.watch("t2", "MSFT")
+    thread = prefetcher._thread
+    assert wait_until(lambda: prefetcher.metrics().refreshes == 2)
+
+    clock.now = 800.0
+    prefetcher.watch("t2", "MSFT")
+    tick(prefetcher, clock, 101.0)
+    assert wait_until(lambda: prefetcher.metrics().sessions == 1)
+    assert prefetcher.metrics().symbols == 1
+
+    tick(prefetcher, clock, 800.0)
+    thread.join(5)
+    assert not thread.is_alive()
+    metrics = prefetcher.metrics()
+    assert (metrics.sessions, metrics.symbols) == (0, 0)
+
+    # Watching again starts a new thread.
+    refreshes = metrics.refreshes
+    prefetcher.watch("t1", "AAPL")
+    assert prefetcher._thread is not thread
+    assert wait_until(lambda: prefetcher.metrics().refreshes == refreshes + 1)
+
+
+def test_refreshes_are_deferred_while_the_rate_limiter_is_saturated() -> None:
+    clock = FakeClock()
+    prefetcher = prefetcher_for(clock, max_calls=2, reserved_slots=1)
+    # An interactive request holds one of the two slots of the minute.
+    prefetcher.alpha_vantage.rate_limiter.reserve()
+
+    prefetcher.watch("t1", "AAPL")
+    assert wait_until(lambda: prefetcher.metrics().deferred == 1)
+    assert prefetcher.alpha_vantage.time_series.calls == 0
+
+    # Deferred refreshes are retried every period / max_calls seconds.
+    tick(prefetcher, clock, 30.0)
+    assert wait_until(lambda: prefetcher.metrics().deferred == 2)
+
+    tick(prefetcher, clock, 31.0)
+    assert wait_until(lambda: prefetcher.metrics().refreshes == 1)
+    assert prefetcher.alpha_vantage.time_series.calls == 1
+
+
+def test_symbols_fresh_in_the_cache_are_skipped() -> None:
+    clock = FakeClock()
+    prefetcher = prefetcher_for(clock)
+    alpha_vantage = prefetcher.alpha_vantage
+    alpha_vantage.intraday_cache.ttl = 600.0
+    alpha_vantage.get_intraday("AAPL")
+
+    prefetcher.watch("t1", "AAPL")
+    assert wait_until(lambda: prefetcher.metrics().skipped_fresh == 1)
+    assert alpha_vantage.time_series.calls == 1
@@ -0,0 +1,48 @@
+import asyncio
+
+from app.resources.intraday_client import AsyncIntradayClient
+from app.resources.rate_limit import RateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_slots_wait_for_the_window() -> None:
+    clock = FakeClock()
+    rate_limiter = RateLimiter(max_calls=2, period=60.0, clock=clock)
+
+    assert [rate_limiter.reserve() for _ in range(3)] == [0.0, 0.0, 60.0]
+    clock.now = 30.0
+    assert rate_limiter.reserve() == 30.0
+
+
+def test_cancelled_slot_goes_to_the_next_caller() -> None:
+    clock = FakeClock()
+    rate_limiter = RateLimiter(max_calls=1, period=60.0, clock=clock)
+
+    rate_limiter.reserve()
+    slot = rate_limiter.reserve_slot()
+    assert slot == 60.0
+    rate_limiter.cancel(slot)
+    assert rate_limiter.reserve() == 60.0
+
+
+def test_request_cancelled_before_its_slot_gives_it_back() -> None:
+    rate_limiter = RateLimiter(max_calls=1, period=60.0)
+    rate_limiter.reserve()
+
+    async def cancel_waiting_request() -> None:
+        async with AsyncIntradayClient(rate_limiter, api_key="demo") as client:
+            request = asyncio.create_task(client.get_intraday("AAPL"))
+            await asyncio.sleep(0.01)
+            request.cancel()
+            await asyncio.gather(request, return_exceptions=True)
+
+    asyncio.run(cancel_waiting_request())
+    # Only the first call holds a slot, so the next one waits for it alone.
+    assert 59.0 < rate_limiter.reserve() <= 60.0
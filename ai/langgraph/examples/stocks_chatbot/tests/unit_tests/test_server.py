@@ -0,0 +1,68 @@
+import argparse
+import asyncio
+import json
+
+from langchain_core.messages import AIMessage
+
+from app.server import ChatServer
+from benchmarks.load_test import scaling
+
+
+class FlakyGraph:
+    """Replies with the content, or fails the turn when it says so."""
+
+    async def ainvoke(self, graph_input: dict, config: dict) -> dict:
+        content = graph_input["messages"][0]["content"]
+        if content == "fail":
+            raise RuntimeError("graph failed")
+        return {"messages": [AIMessage(content.upper())]}
+
+
+def exchange(lines: list[bytes]) -> list[dict]:
+    async def __main() -> list[dict]:
+        server = await asyncio.start_server(
+            ChatServer(FlakyGraph()).handle_connection, "127.0.0.1", 0
+        )
+        async with server:
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            responses = []
+            for line in lines:
+                writer.write(line + b"\n")
+                responses.append(json.loads(await reader.readline()))
+            writer.close()
+            return responses
+
+    return asyncio.run(__main())
+
+
+def test_errors_are_answered_and_the_connection_stays_open() -> None:
+    bad_json, no_content, fail, ok = exchange(
+        [
+            b"{not json",
+            json.dumps({"thread_id": "t"}).encode(),
+            json.dumps({"thread_id": "t", "content": "fail"}).encode(),
+            json.dumps({"thread_id": "t", "content": "hi"}).encode(),
+        ]
+    )
+
+    assert bad_json["error"].startswith("bad request")
+    assert no_content["error"].startswith("bad request")
+    assert fail == {"thread_id": "t", "error": "internal error"}
+    assert ok["reply"] == "HI"
+
+
+def test_throughput_scales_with_concurrency() -> None:
+    args = argparse.Namespace(
+        host="127.0.0.1",
+        sessions=32,
+        turns=2,
+        max_concurrency=32,
+        max_pending=1024,
+        model_latency_ms=100.0,
+    )
+
+    result = asyncio.run(scaling(args, baseline_concurrency=4))
+
+    assert result["full"]["rejected"] == 0
+    assert result["scales"], result["speedup"]
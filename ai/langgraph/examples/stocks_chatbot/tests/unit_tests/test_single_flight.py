@@ -0,0 +1,238 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.resources.alpha_vantage import AlphaVantageResources
+from app.resources.cache import TTLCache
+from app.resources.rate_limit import RateLimiter
+from app.resources.single_flight import SingleFlight
+
+
+class StubProvider:
+    """Blocks every fetch until released, so callers pile up behind it."""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.calls = 0
+        self.release = threading.Event()
+
+    def get_intraday(self, symbol: str, interval: str = "15min") -> tuple[dict, dict]:
+        self.calls += 1
+        self.release.wait(5)
+        if self.fail:
+            raise ValueError(f"no data for {symbol}")
+        bar = {
+            "1. open": "1.0",
+            "2. high": "2.0",
+            "3. low": "0.5",
+            "4. close": "1.5",
+            "5. volume": "100",
+        }
+        return {"2025-05-16 19:45:00": bar}, {"2. Symbol": symbol}
+
+
+def wait_for_calls(flights: SingleFlight, calls: int) -> None:
+    deadline = time.monotonic() + 5
+    while flights.metrics().calls < calls and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+def concurrent_fetches(
+    alpha_vantage: AlphaVantageResources, provider: StubProvider, symbols: list[str]
+) -> list:
+    def __fetch(symbol: str):
+        try:
+            return alpha_vantage.get_intraday(symbol)
+        except ValueError as error:
+            return error
+
+    with ThreadPoolExecutor(max_workers=len(symbols)) as executor:
+        futures = [executor.submit(__fetch, symbol) for symbol in symbols]
+        wait_for_calls(alpha_vantage.fetches, len(symbols))
+        provider.release.set()
+        return [future.result() for future in futures]
+
+
+def resources_for(provider: StubProvider) -> AlphaVantageResources:
+    return AlphaVantageResources(
+        time_series=provider, rate_limiter=RateLimiter(max_calls=1_000)
+    )
+
+
+def test_concurrent_fetches_of_a_symbol_share_one_call() -> None:
+    provider = StubProvider()
+    alpha_vantage = resources_for(provider)
+
+    results = concurrent_fetches(alpha_vantage, provider, ["AAPL"] * 16)
+
+    assert provider.calls == 1
+    assert all(bars is results[0] for bars in results)
+    metrics = alpha_vantage.fetches.metrics()
+    assert (metrics.calls, metrics.executions, metrics.coalesced) == (16, 1, 15)
+    assert metrics.in_flight == 0
+
+
+def test_different_symbols_are_not_coalesced() -> None:
+    provider = StubProvider()
+    alpha_vantage = resources_for(provider)
+
+    results = concurrent_fetches(alpha_vantage, provider, ["AAPL", "MSFT"] * 4)
+
+    assert provider.calls == 2
+    assert {bars.symbol for bars in results} == {"AAPL", "MSFT"}
+    assert alpha_vantage.fetches.metrics().coalesced == 6
+
+
+def test_errors_reach_every_waiter_and_are_not_remembered() -> None:
+    provider = StubProvider(fail=True)
+    alpha_vantage = resources_for(provider)
+
+    results = concurrent_fetches(alpha_vantage, provider, ["AAPL"] * 8)
+
+    assert provider.calls == 1
+    assert all(isinstance(error, ValueError) for error in results)
+
+    provider.fail = False
+    assert alpha_vantage.get_intraday("AAPL").symbol == "AAPL"
+    assert provider.calls == 2
+
+
+def test_async_calls_of_a_key_share_one_call() -> None:
+    flights = SingleFlight()
+    calls = 0
+
+    async def __fetch() -> str:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "bars"
+
+    async def __main() -> list[str]:
+        return await asyncio.gather(*(flights.ado("AAPL", __fetch) for _ in range(10)))
+
+    assert asyncio.run(__main()) == ["bars"] * 10
+    assert calls == 1
+    assert flights.metrics().coalesced == 9
+
+
+def test_async_errors_reach_every_waiter() -> None:
+    flights = SingleFlight()
+
+    async def __fetch() -> str:
+        await asyncio.sleep(0.01)
+        raise ValueError("no data")
+
+    async def __main() -> list:
+        return await asyncio.gather(
+            *(flights.ado("AAPL", __fetch) for _ in range(3)), return_exceptions=True
+        )
+
+    results = asyncio.run(__main())
+    assert all(isinstance(error, ValueError) for error in results)
+    with pytest.raises(ValueError):
+        asyncio.run(flights.ado("AAPL", __fetch))
+
+
+def test_threads_and_tasks_share_one_call() -> None:
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = 0
+
+    def __fetch() -> str:
+        nonlocal calls
+        calls += 1
+        release.wait(5)
+        return "bars"
+
+    async def __afetch() -> str:
+        return await asyncio.to_thread(__fetch)
+
+    def __run_loop() -> str:
+        # Like the batch tool's sync path, each call runs a loop of its own.
+        return asyncio.run(flights.ado("AAPL", __afetch))
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        futures = [executor.submit(flights.do, "AAPL", __fetch) for _ in range(3)]
+        futures += [executor.submit(__run_loop) for _ in range(3)]
+        wait_for_calls(flights, 6)
+        release.set()
+        results = [future.result(5) for future in futures]
+
+    assert results == ["bars"] * 6
+    assert calls == 1
+    assert flights.metrics().coalesced == 5
+    assert flights.metrics().in_flight == 0
+
+
+def test_cancelled_follower_does_not_cancel_the_call() -> None:
+    flights = SingleFlight()
+
+    async def __fetch() -> str:
+        await asyncio.sleep(0.05)
+        return "bars"
+
+    async def __main() -> str:
+        leader = asyncio.create_task(flights.ado("AAPL", __fetch))
+        follower = asyncio.create_task(flights.ado("AAPL", __fetch))
+        await asyncio.sleep(0.01)
+        follower.cancel()
+        return await leader
+
+    assert asyncio.run(__main()) == "bars"
+
+
+def test_followers_of_a_cancelled_call_run_it_again() -> None:
+    flights = SingleFlight()
+
+    async def __hang() -> str:
+        await asyncio.sleep(10)
+        return "never"
+
+    async def __afetch() -> str:
+        return "bars"
+
+    async def __main() -> list[str]:
+        leader = asyncio.create_task(flights.ado("AAPL", __hang))
+        follower = asyncio.create_task(flights.ado("AAPL", __afetch))
+        thread = asyncio.create_task(
+            asyncio.to_thread(flights.do, "AAPL", lambda: "bars")
+        )
+        await asyncio.to_thread(wait_for_calls, flights, 3)
+        # Like the batch timeout, which cancels the fetches still waiting.
+        leader.cancel()
+        return await asyncio.gather(follower, thread)
+
+    assert asyncio.run(__main()) == ["bars", "bars"]
+    assert flights.metrics().in_flight == 0
+
+
+class MissOnce(TTLCache):
+    """Misses one lookup, like a caller that checked just before a call finished."""
+
+    def __init__(self):
+        super().__init__()
+        self.miss = False
+
+    def get(self, key):
+        if self.miss:
+            self.miss = False
+            return None
+        return super().get(key)
+
+
+def test_leader_checks_the_cache_again() -> None:
+    provider = StubProvider()
+    provider.release.set()
+    alpha_vantage = AlphaVantageResources(
+        time_series=provider,
+        intraday_cache=MissOnce(),
+        rate_limiter=RateLimiter(max_calls=1_000),
+    )
+    bars = alpha_vantage.get_intraday("AAPL")
+
+    alpha_vantage.intraday_cache.miss = True
+    assert alpha_vantage.get_intraday("AAPL") is bars
+    assert provider.calls == 1
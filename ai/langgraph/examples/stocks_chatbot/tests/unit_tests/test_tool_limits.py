@@ -0,0 +1,87 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.tools import tool
+
+from app.graph.graph import graph
+from app.graph.tool_limits import with_limits
+from app.resources.resources import resources
+from benchmarks.fakes import FakeTimeSeries, ScriptedChatModel, tool_calls
+
+LATENCIES = {"AAPL": 0.1, "MSFT": 0.2, "GOOG": 0.3, "AMZN": 0.4}
+
+
+def compare_turn(use_async: bool) -> tuple[float, list[ToolMessage]]:
+    stocks_graph = graph(
+        resources(
+            chat_model=ScriptedChatModel(
+                script=[
+                    tool_calls("get_intraday_data", [{"symbol": s} for s in LATENCIES]),
+                    AIMessage("Compared."),
+                ]
+            ),
+            time_series=FakeTimeSeries(latencies=LATENCIES),
+            intraday_ttl=0.0,
+            requests_per_minute=1_000_000,
+            tool_workers=len(LATENCIES),
+        )
+    )
+    config = {"configurable": {"thread_id": "t"}}
+    turn_input = {"messages": [{"role": "user", "content": "Compare them."}]}
+
+    start = time.perf_counter()
+    if use_async:
+        state = asyncio.run(stocks_graph.ainvoke(turn_input, config))
+    else:
+        state = stocks_graph.invoke(turn_input, config)
+    elapsed = time.perf_counter() - start
+    return elapsed, [m for m in state["messages"] if isinstance(m, ToolMessage)]
+
+
+def test_tool_calls_of_a_reply_run_in_parallel() -> None:
+    slowest, sequential = max(LATENCIES.values()), sum(LATENCIES.values())
+
+    for use_async in (False, True):
+        elapsed, tool_messages = compare_turn(use_async)
+
+        assert len(tool_messages) == len(LATENCIES)
+        assert not any("took longer" in str(m.content) for m in tool_messages)
+        assert slowest <= elapsed < (slowest + sequential) / 2, use_async
+
+
+def test_async_sync_tools_do_not_hold_a_default_executor_thread() -> None:
+    @tool
+    def slow(seconds: float) -> str:
+        """Sleep for seconds."""
+        time.sleep(seconds)
+        return "done"
+
+    (limited,) = with_limits([slow], max_workers=4, timeout=1.0)
+
+    async def __main() -> tuple[float, list[str]]:
+        # With one default executor thread, calls blocking on it would queue.
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(1))
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(limited.ainvoke({"seconds": 0.2}) for _ in range(4))
+        )
+        return time.perf_counter() - start, results
+
+    elapsed, results = asyncio.run(__main())
+
+    assert results == ["done"] * 4
+    assert elapsed < 0.4
+
+
+def test_slow_sync_tool_times_out_under_ainvoke() -> None:
+    @tool
+    def slow(seconds: float) -> str:
+        """Sleep for seconds."""
+        time.sleep(seconds)
+        return "done"
+
+    (limited,) = with_limits([slow], timeout=0.1)
+
+    assert "took longer than 0.1s" in asyncio.run(limited.ainvoke({"seconds": 0.3}))
@@ -0,0 +1,94 @@
+import asyncio
+import json
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import AIMessage
+
+from app.graph.graph import graph
+from app.resources.resources import resources
+from benchmarks.fakes import FakeTimeSeries, ScriptedChatModel, tool_call
+
+
+def traced_graph(trace_path: str):
+    return graph(
+        resources(
+            chat_model=ScriptedChatModel(
+                script=[tool_call("get_intraday_data", symbol="AAPL"), AIMessage("ok")]
+            ),
+            time_series=FakeTimeSeries(),
+            trace_path=str(trace_path),
+        )
+    )
+
+
+def spans(trace_path: str) -> list[dict]:
+    with open(trace_path) as file:
+        return [json.loads(line) for line in file]
+
+
+def span_kinds(trace_path: str) -> dict[str, int]:
+    kinds = {}
+    for span in spans(trace_path):
+        kinds[span["kind"]] = kinds.get(span["kind"], 0) + 1
+    return kinds
+
+
+def test_per_call_callbacks_do_not_replace_the_tracer(tmp_path) -> None:
+    trace_path = tmp_path / "spans.jsonl"
+    stocks_graph = traced_graph(trace_path)
+    handler = BaseCallbackHandler()
+
+    stocks_graph.invoke(
+        {"messages": [{"role": "user", "content": "AAPL?"}]},
+        {"configurable": {"thread_id": "t"}, "callbacks": [handler]},
+    )
+
+    kinds = span_kinds(trace_path)
+    assert kinds["graph"] == 1
+    assert kinds["node"] == 3
+    assert kinds["model"] == 2
+    assert kinds["tool"] == 1
+    assert kinds["checkpoint"] > 0
+
+
+def test_async_runs_are_traced(tmp_path) -> None:
+    trace_path = tmp_path / "spans.jsonl"
+    stocks_graph = traced_graph(trace_path)
+
+    asyncio.run(
+        stocks_graph.ainvoke(
+            {"messages": [{"role": "user", "content": "AAPL?"}]},
+            {"configurable": {"thread_id": "t"}},
+        )
+    )
+
+    assert span_kinds(trace_path)["tool"] == 1
+
+
+def test_checkpoint_spans_join_the_graph_run(tmp_path) -> None:
+    trace_path = tmp_path / "spans.jsonl"
+    stocks_graph = traced_graph(trace_path)
+
+    stocks_graph.invoke(
+        {"messages": [{"role": "user", "content": "AAPL?"}]},
+        {"configurable": {"thread_id": "t"}},
+    )
+
+    (graph_span,) = [span for span in spans(trace_path) if span["kind"] == "graph"]
+    checkpoints = [span for span in spans(trace_path) if span["kind"] == "checkpoint"]
+    assert checkpoints
+    for span in checkpoints:
+        assert span["trace_id"] == graph_span["trace_id"]
+        assert span["parent_span_id"] == graph_span["span_id"]
+
+
+def test_traced_graph_can_be_configured(tmp_path) -> None:
+    trace_path = tmp_path / "spans.jsonl"
+    stocks_graph = traced_graph(trace_path).with_config(recursion_limit=10)
+    config = {"configurable": {"thread_id": "t"}}
+
+    stocks_graph.update_state(config, {"favorite_symbol": "MSFT"})
+    stocks_graph.invoke({"messages": [{"role": "user", "content": "AAPL?"}]}, config)
+
+    assert stocks_graph.get_state(config).values["favorite_symbol"] == "MSFT"
+    assert span_kinds(trace_path)["graph"] == 1
@@ -0,0 +1,133 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SOURCE = os.path.join(HERE, "o200k.txt")
+MODES = ["per_line", "batched", "processes"]
+
+
+def write_scaled_input(directory, scale):
+    '''
+      Writes o200k.txt repeated scale times and returns the new file path.
+    '''
+    path = os.path.join(directory, f"o200k-x{scale}.txt")
+    with open(SOURCE, 'r', encoding='utf-8') as file:
+        text = file.read()
+    if not text.endswith("\n"):
+        text += "\n"
+    with open(path, 'w', encoding='utf-8') as file:
+        for _ in range(scale):
+            file.write(text)
+    return path
+
+
+def run_mode(mode, file_path, batch_size, workers):
+    '''
+      Runs one mode in the current process and returns its measurements.
+      Called in a fresh interpreter per run so startup time and peak RSS are
+      not shared between modes.
+    '''
+    start = time.perf_counter()
+    from encoding import get_encoding
+    from main import encode_batches, read_batches
+
+    encoding = get_encoding()
+    startup = time.perf_counter() - start
+
+    line_count = 0
+    token_count = 0
+    start = time.perf_counter()
+    if mode == "per_line":
+        with open(file_path, 'r', encoding='utf-8') as file:
+            for line in file:
+                token_count += len(encoding.encode(line.strip()))
+                line_count += 1
+    else:
+        batches = read_batches(file_path, batch_size)
+        for lines, batch_tokens in encode_batches(batches, workers, processes=mode == "processes"):
+            line_count += len(lines)
+            token_count += sum(len(tokens) for tokens in batch_tokens)
+    elapsed = time.perf_counter() - start
+
+    # ru_maxrss is in KiB on Linux and bytes on macOS.
+    rss_unit = 1 if sys.platform == "darwin" else 1024
+    return {
+        "mode": mode,
+        "lines": line_count,
+        "tokens": token_count,
+        "seconds": elapsed,
+        "lines_per_sec": line_count / elapsed if elapsed else None,
+        "tokens_per_sec": token_count / elapsed if elapsed else None,
+        "startup_seconds": startup,
+        "peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * rss_unit,
+        "peak_child_rss_bytes": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * rss_unit,
+    }
+
+
+def run_isolated(mode, file_path, batch_size, workers):
+    command = [sys.executable, os.path.join(HERE, "bench.py"), "--run-mode", mode, "--input", file_path,
+               "--batch-size", str(batch_size)]
+    if workers:
+        command += ["--workers", str(workers)]
+    output = subprocess.run(command, cwd=HERE, capture_output=True, text=True, check=True).stdout
+    return json.loads(output)
+
+
+def run_suite(scales, modes, batch_size, workers):
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for scale in scales:
+            file_path = write_scaled_input(directory, scale)
+            size = os.path.getsize(file_path)
+            for mode in modes:
+                result = run_isolated(mode, file_path, batch_size, workers)
+                result.update(scale=scale, input_bytes=size)
+                print(f"x{scale} {mode}: {result['tokens_per_sec']:,.0f} tokens/s", file=sys.stderr)
+                results.append(result)
+            os.remove(file_path)
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "batch_size": batch_size,
+        "workers": workers,
+        "results": results,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the tokenizer modes on scaled copies of o200k.txt.")
+    parser.add_argument("--scales", default="1,100,10000", help="comma-separated repeat counts of o200k.txt")
+    parser.add_argument("--modes", default=",".join(MODES), help=f"comma-separated subset of {MODES}")
+    parser.add_argument("--batch-size", type=int, default=1024)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", default=None, help="write the JSON report here instead of stdout")
+    parser.add_argument("--run-mode", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--input", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.run_mode:
+        print(json.dumps(run_mode(args.run_mode, args.input, args.batch_size, args.workers)))
+        sys.exit()
+
+    report = run_suite(
+        [int(scale) for scale in args.scales.split(",")],
+        args.modes.split(","),
+        args.batch_size,
+        args.workers,
+    )
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
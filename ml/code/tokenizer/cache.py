@@ -0,0 +1,150 @@
+import hashlib
+import sqlite3
+import sys
+from array import array
+from collections import OrderedDict
+
+from encoding import vocab_fingerprint
+from writers import TOKEN_TYPECODE
+
+
+def line_key(line, salt):
+    '''
+      Returns a 16-byte content hash of a line, keyed with the encoding's
+      vocab fingerprint so an on-disk store is never reused across
+      encodings or vocab files.
+    '''
+    return hashlib.blake2b(line.encode('utf-8'), digest_size=16, key=salt).digest()
+
+
+class DiskStore:
+    '''
+      SQLite table of line hash -> packed uint32 tokens that survives across runs.
+      New entries are buffered and written in batches of flush_size.
+    '''
+
+    def __init__(self, path, flush_size=1000):
+        self.flush_size = flush_size
+        self.pending = {}
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS tokens (key BLOB PRIMARY KEY, tokens BLOB NOT NULL)"
+        )
+
+    def get_pending(self, keys):
+        return {key: self.pending[key] for key in keys if key in self.pending}
+
+    def get_many(self, keys):
+        found = {}
+        for start in range(0, len(keys), 500):
+            part = keys[start:start + 500]
+            rows = self.connection.execute(
+                f"SELECT key, tokens FROM tokens WHERE key IN ({','.join('?' * len(part))})", part
+            )
+            for key, blob in rows:
+                tokens = array(TOKEN_TYPECODE)
+                tokens.frombytes(blob)
+                found[key] = tokens.tolist()
+        return found
+
+    def put_many(self, items):
+        self.pending.update(items)
+        if len(self.pending) >= self.flush_size:
+            self.flush()
+
+    def flush(self):
+        self.connection.executemany(
+            "INSERT OR IGNORE INTO tokens (key, tokens) VALUES (?, ?)",
+            [(key, array(TOKEN_TYPECODE, tokens).tobytes()) for key, tokens in self.pending.items()],
+        )
+        self.connection.commit()
+        self.pending.clear()
+
+    def close(self):
+        self.flush()
+        self.connection.close()
+
+
+class TokenCache:
+    '''
+      Content-hash cache in front of encode. Holds up to max_entries lines in
+      an in-memory LRU and, when a store path is given, falls back to an
+      on-disk store so repeated lines skip BPE across runs. Lines found in
+      the store's unflushed buffer count as pending hits, not disk hits.
+    '''
+
+    def __init__(self, encoding, max_entries=100_000, store_path=None):
+        self.encoding = encoding
+        self.salt = vocab_fingerprint(encoding)
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.store = DiskStore(store_path) if store_path else None
+        self.hits = 0
+        self.pending_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _remember(self, key, tokens):
+        self.entries[key] = tokens
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def encode(self, line):
+        return self.encode_batch([line], num_threads=1)[0]
+
+    def encode_batch(self, lines, num_threads=8):
+        '''
+          Encodes a batch of lines, running BPE only for lines missing from
+          both the memory and the disk cache. Duplicates inside the batch are
+          encoded once.
+        '''
+        keys = [line_key(line, self.salt) for line in lines]
+        results = {}
+        missing = {}
+        for key, line in zip(keys, lines):
+            if key in results or key in missing:
+                continue
+            tokens = self.entries.get(key)
+            if tokens is not None:
+                self.entries.move_to_end(key)
+                results[key] = tokens
+            else:
+                missing[key] = line
+
+        pending_hits = disk_hits = 0
+        if missing and self.store:
+            pending = self.store.get_pending(list(missing))
+            stored = self.store.get_many([key for key in missing if key not in pending])
+            for key, tokens in (*pending.items(), *stored.items()):
+                del missing[key]
+                results[key] = tokens
+                self._remember(key, tokens)
+            pending_hits, disk_hits = len(pending), len(stored)
+
+        if missing:
+            encoded = self.encoding.encode_batch(list(missing.values()), num_threads=num_threads)
+            new_items = list(zip(missing, encoded))
+            for key, tokens in new_items:
+                results[key] = tokens
+                self._remember(key, tokens)
+            if self.store:
+                self.store.put_many(new_items)
+
+        self.misses += len(missing)
+        self.pending_hits += pending_hits
+        self.disk_hits += disk_hits
+        self.hits += len(lines) - len(missing) - pending_hits - disk_hits
+        return [results[key] for key in keys]
+
+    def print_stats(self):
+        print(
+            f"token cache: {self.hits} memory hits, {self.pending_hits} pending hits, "
+            f"{self.disk_hits} disk hits, {self.misses} misses, {len(self.entries)} entries",
+            file=sys.stderr,
+        )
+
+    def close(self):
+        if self.store:
+            self.store.close()
@@ -0,0 +1,181 @@
+import base64
+import functools
+import hashlib
+import os
+import subprocess
+import sys
+import tempfile
+import zipfile
+
+import numpy as np
+import tiktoken
+
+ENCODING_NAME = "o200k_base"
+
+# Environment variables rather than arguments, so worker processes inherit them.
+VOCAB_ENV = "TOKENIZER_VOCAB"
+CACHE_DIR_ENV = "TOKENIZER_CACHE_DIR"
+
+O200K_PAT_STR = "|".join(
+    [
+        r"""[^\r\n\p{L}\p{N}]?[\p{Lu}\p{Lt}\p{Lm}\p{Lo}\p{M}]*[\p{Ll}\p{Lm}\p{Lo}\p{M}]+(?i:'s|'t|'re|'ve|'m|'ll|'d)?""",
+        r"""[^\r\n\p{L}\p{N}]?[\p{Lu}\p{Lt}\p{Lm}\p{Lo}\p{M}]+[\p{Ll}\p{Lm}\p{Lo}\p{M}]*(?i:'s|'t|'re|'ve|'m|'ll|'d)?""",
+        r"""\p{N}{1,3}""",
+        r""" ?[^\s\p{L}\p{N}]+[\r\n/]*""",
+        r"""\s*[\r\n]+""",
+        r"""\s+(?!\S)""",
+        r"""\s+""",
+    ]
+)
+O200K_SPECIAL_TOKENS = {"<|endoftext|>": 199999, "<|endofprompt|>": 200018}
+
+
+def parse_vocab(vocab_path):
+    '''
+      Parses a .tiktoken vocab file (one "base64-token rank" pair per line)
+      into the mergeable ranks expected by tiktoken.Encoding.
+    '''
+    with open(vocab_path, 'rb') as file:
+        return {
+            base64.b64decode(token): int(rank)
+            for token, rank in (line.split() for line in file if line.strip())
+        }
+
+
+def default_cache_dir():
+    '''
+      Returns the per-user cache directory, $XDG_CACHE_HOME/tokenizer or
+      ~/.cache/tokenizer, rather than a shared temp directory other users
+      could write to.
+    '''
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "tokenizer")
+
+
+def _ranks_cache_path(vocab_path, cache_dir):
+    stat = os.stat(vocab_path)
+    key = f"{os.path.abspath(vocab_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+    return os.path.join(cache_dir, f"{ENCODING_NAME}-{hashlib.sha256(key.encode()).hexdigest()[:16]}.npz")
+
+
+def _save_ranks(cache_path, ranks):
+    tokens = list(ranks)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as file:
+        np.savez(
+            file,
+            tokens=np.frombuffer(b"".join(tokens), dtype=np.uint8),
+            lengths=np.array([len(token) for token in tokens], dtype="<u2"),
+            ranks=np.array(list(ranks.values()), dtype="<u4"),
+        )
+    os.replace(tmp_path, cache_path)
+
+
+def _read_ranks(cache_path):
+    with np.load(cache_path, allow_pickle=False) as cache:
+        blob = cache["tokens"].tobytes()
+        ends = np.cumsum(cache["lengths"], dtype=np.int64).tolist()
+        ranks = cache["ranks"].tolist()
+    if len(ends) != len(ranks) or (ends and ends[-1] != len(blob)):
+        raise ValueError(f"{cache_path} is inconsistent")
+    return {blob[start:end]: rank for start, end, rank in zip([0, *ends], ends, ranks)}
+
+
+def load_ranks(vocab_path, cache_dir=None):
+    '''
+      Returns the mergeable ranks of a local vocab file. The parsed ranks are
+      saved to cache_dir (default_cache_dir() by default), keyed by the vocab
+      path, size and mtime, so later processes skip the base64 parsing. The
+      cache holds plain arrays read without pickle, so a tampered cache file
+      can at worst yield wrong ranks, never run code.
+    '''
+    cache_dir = cache_dir or default_cache_dir()
+    cache_path = _ranks_cache_path(vocab_path, cache_dir)
+    try:
+        return _read_ranks(cache_path)
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        pass
+
+    ranks = parse_vocab(vocab_path)
+    os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+    _save_ranks(cache_path, ranks)
+    return ranks
+
+
+def load_encoding(vocab_path=None, cache_dir=None):
+    '''
+      Builds the o200k_base encoding from a local vocab file without any
+      network access. Without a vocab file it falls back to
+      tiktoken.get_encoding, which may download the ranks.
+    '''
+    if not vocab_path:
+        return tiktoken.get_encoding(ENCODING_NAME)
+    return tiktoken.Encoding(
+        name=ENCODING_NAME,
+        pat_str=O200K_PAT_STR,
+        mergeable_ranks=load_ranks(vocab_path, cache_dir),
+        special_tokens=O200K_SPECIAL_TOKENS,
+    )
+
+
+def vocab_fingerprint(encoding):
+    '''
+      Returns a 16-byte hash of everything that decides an encoding's output:
+      its split pattern, mergeable ranks and special tokens. Two encodings
+      with the same name but different vocab files get different hashes.
+    '''
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(encoding._pat_str.encode())
+    for token, rank in encoding._mergeable_ranks.items():
+        digest.update(len(token).to_bytes(2, 'little') + token + rank.to_bytes(4, 'little'))
+    for token, rank in sorted(encoding._special_tokens.items()):
+        digest.update(token.encode() + rank.to_bytes(4, 'little'))
+    return digest.digest()
+
+
+@functools.cache
+def get_encoding():
+    '''
+      Returns the encoding shared by every tokenizer mode, built once per
+      process from $TOKENIZER_VOCAB when it is set.
+    '''
+    return load_encoding(os.environ.get(VOCAB_ENV), os.environ.get(CACHE_DIR_ENV))
+
+
+def measure_startup(vocab_path, cache_dir=None, runs=3):
+    '''
+      Times encoding construction in fresh interpreters: tiktoken's own
+      loader, the local vocab loader with an empty parse cache, and with a
+      warm one. Returns the best time of each in seconds, or None for a
+      loader that failed.
+    '''
+    script = (
+        "import sys, time; start = time.perf_counter(); import encoding; "
+        "encoding.load_encoding(*sys.argv[1:]); print(time.perf_counter() - start)"
+    )
+    here = os.path.dirname(os.path.abspath(__file__))
+
+    def run(*args):
+        process = subprocess.run([sys.executable, "-c", script, *args], cwd=here, capture_output=True, text=True)
+        # tiktoken's loader fails on air-gapped machines without a download cache.
+        return float(process.stdout) if process.returncode == 0 else None
+
+    def best(times):
+        return None if None in times else min(times)
+
+    with tempfile.TemporaryDirectory() as cold_dir:
+        cache_dir = cache_dir or os.path.join(cold_dir, "warm")
+        results = {
+            "tiktoken": best([run() for _ in range(runs)]),
+            "local_cold": best([run(vocab_path, os.path.join(cold_dir, str(i))) for i in range(runs)]),
+        }
+        run(vocab_path, cache_dir)
+        results["local_warm"] = best([run(vocab_path, cache_dir) for _ in range(runs)])
+    return results
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit(f"usage: {sys.argv[0]} VOCAB_FILE [CACHE_DIR]")
+    for name, seconds in measure_startup(*sys.argv[1:3]).items():
+        print(f"{name}: " + ("unavailable" if seconds is None else f"{seconds * 1000:.1f} ms"))
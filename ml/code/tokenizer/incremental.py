@@ -0,0 +1,144 @@
+import hashlib
+import json
+import os
+import sys
+import time
+import zlib
+from array import array
+
+from encoding import get_encoding, vocab_fingerprint
+from reader import ShardReader
+from streaming import list_inputs
+from writers import OFFSET_TYPECODE, ShardWriter, to_little_endian
+
+MANIFEST_NAME = "incremental.json"
+CHUNKS_DIR = "chunks"
+
+
+def split_chunks(file_path, average_lines=1024, min_lines=64, max_lines=16384, salt=b""):
+    '''
+      Yields (chunk hash, lines) for a file using content-defined chunking:
+      a chunk ends after a line whose crc32 hits a boundary mask. Boundaries
+      depend only on nearby content, so an edit only changes the chunks
+      around it instead of shifting every chunk after it. The hash is keyed
+      with salt, the vocab fingerprint, so chunks stored under one vocab are
+      not reused under another.
+    '''
+    mask = (1 << max(average_lines.bit_length() - 1, 0)) - 1
+    lines = []
+    digest = hashlib.blake2b(digest_size=16, key=salt)
+    with open(file_path, 'rb') as file:
+        for raw_line in file:
+            lines.append(raw_line.decode('utf-8').strip())
+            digest.update(raw_line)
+            if len(lines) >= max_lines or (len(lines) >= min_lines and zlib.crc32(raw_line) & mask == 0):
+                yield digest.hexdigest(), lines
+                lines = []
+                digest = hashlib.blake2b(digest_size=16, key=salt)
+    if lines:
+        yield digest.hexdigest(), lines
+
+
+def _chunk_prefix(out_dir, chunk_hash):
+    return os.path.join(out_dir, CHUNKS_DIR, chunk_hash)
+
+
+def _chunk_exists(out_dir, chunk_hash):
+    prefix = _chunk_prefix(out_dir, chunk_hash)
+    return os.path.exists(f"{prefix}.bin") and os.path.exists(f"{prefix}.idx")
+
+
+def write_chunk(out_dir, chunk_hash, lines, encoding, num_threads):
+    prefix = _chunk_prefix(out_dir, chunk_hash)
+    tmp_prefix = f"{prefix}.{os.getpid()}.tmp"
+    with ShardWriter(tmp_prefix) as writer:
+        for line, tokens in zip(lines, encoding.encode_batch(lines, num_threads=num_threads)):
+            writer.write(line, tokens)
+    os.replace(f"{tmp_prefix}.bin", f"{prefix}.bin")
+    os.replace(f"{tmp_prefix}.idx", f"{prefix}.idx")
+
+
+def splice_chunks(out_dir, chunk_hashes, output_prefix):
+    '''
+      Concatenates chunk shards into one shard at output_prefix, copying the
+      token bytes as-is and rebasing the offsets.
+    '''
+    os.makedirs(os.path.dirname(output_prefix) or ".", exist_ok=True)
+    tmp_prefix = f"{output_prefix}.tmp"
+    base = 0
+    with open(f"{tmp_prefix}.bin", 'wb') as bin_file, open(f"{tmp_prefix}.idx", 'wb') as idx_file:
+        to_little_endian(array(OFFSET_TYPECODE, [0])).tofile(idx_file)
+        for chunk_hash in chunk_hashes:
+            with ShardReader(_chunk_prefix(out_dir, chunk_hash)) as chunk:
+                bin_file.write(chunk.data)
+                offsets = array(OFFSET_TYPECODE, (chunk.offsets[1:] + base).tolist())
+                base += len(chunk.data)
+            to_little_endian(offsets).tofile(idx_file)
+    os.replace(f"{tmp_prefix}.bin", f"{output_prefix}.bin")
+    os.replace(f"{tmp_prefix}.idx", f"{output_prefix}.idx")
+
+
+def _load_manifest(out_dir):
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def _save_manifest(out_dir, manifest):
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    with open(f"{path}.tmp", 'w', encoding='utf-8') as file:
+        json.dump(manifest, file, indent=2)
+    os.replace(f"{path}.tmp", path)
+
+
+def remove_unreferenced_chunks(out_dir, manifest):
+    referenced = {chunk_hash for chunk_hashes in manifest.values() for chunk_hash in chunk_hashes}
+    chunks_dir = os.path.join(out_dir, CHUNKS_DIR)
+    for name in os.listdir(chunks_dir):
+        if name.split(".", 1)[0] not in referenced or ".tmp" in name:
+            os.remove(os.path.join(chunks_dir, name))
+
+
+def tokenize_incremental(input_path, out_dir, average_lines=1024, num_threads=None):
+    '''
+      Tokenizes a file or directory into one bin shard per input file under
+      out_dir, re-encoding only content-defined chunks whose hash is not
+      already stored in out_dir/chunks. Unchanged chunks are spliced in from
+      their stored shards, and files whose chunk list did not change are
+      skipped entirely. Returns (encoded chunks, reused chunks, seconds).
+    '''
+    start = time.perf_counter()
+    num_threads = num_threads or os.cpu_count() or 1
+    os.makedirs(os.path.join(out_dir, CHUNKS_DIR), exist_ok=True)
+    encoding = get_encoding()
+    salt = vocab_fingerprint(encoding)
+    previous = _load_manifest(out_dir)
+    manifest = {}
+    encoded = 0
+    reused = 0
+
+    root = input_path if os.path.isdir(input_path) else os.path.dirname(input_path) or "."
+    for file_path in list_inputs(input_path):
+        relative_path = os.path.relpath(file_path, root)
+        chunk_hashes = []
+        for chunk_hash, lines in split_chunks(file_path, average_lines, salt=salt):
+            if _chunk_exists(out_dir, chunk_hash):
+                reused += 1
+            else:
+                write_chunk(out_dir, chunk_hash, lines, encoding, num_threads)
+                encoded += 1
+            chunk_hashes.append(chunk_hash)
+
+        output_prefix = os.path.join(out_dir, relative_path)
+        unchanged = previous.get(relative_path) == chunk_hashes and os.path.exists(f"{output_prefix}.idx")
+        if not unchanged:
+            splice_chunks(out_dir, chunk_hashes, output_prefix)
+        manifest[relative_path] = chunk_hashes
+
+    _save_manifest(out_dir, manifest)
+    remove_unreferenced_chunks(out_dir, manifest)
+    elapsed = time.perf_counter() - start
+    print(f"{encoded} chunks encoded, {reused} reused in {elapsed:.3f}s", file=sys.stderr)
+    return encoded, reused, elapsed
@@ -0,0 +1,79 @@
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import time
+
+from service import TokenizerClient
+
+SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "o200k.txt")
+
+
+def percentile(sorted_values, percent):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(percent / 100 * len(sorted_values)))]
+
+
+async def run_load(texts, concurrency, requests, mode, socket_path=None, host="127.0.0.1", port=8765):
+    '''
+      Sends requests from concurrency tasks, each on its own connection,
+      and returns throughput and latency percentiles in milliseconds.
+    '''
+    clients = [await TokenizerClient.connect(socket_path, host, port) for _ in range(concurrency)]
+    next_text = itertools.cycle(texts).__next__
+    latencies = []
+    errors = 0
+
+    async def worker(client, count):
+        nonlocal errors
+        for _ in range(count):
+            start = time.perf_counter()
+            try:
+                await client.request(next_text(), mode)
+            except (ValueError, ConnectionError):
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+
+    per_client, extra = divmod(requests, concurrency)
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(client, per_client + (i < extra)) for i, client in enumerate(clients)))
+    elapsed = time.perf_counter() - start
+    for client in clients:
+        await client.close()
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "seconds": elapsed,
+        "requests_per_sec": len(latencies) / elapsed if elapsed else None,
+        "p50_ms": percentile(latencies, 50) * 1000 if latencies else None,
+        "p99_ms": percentile(latencies, 99) * 1000 if latencies else None,
+        "max_ms": latencies[-1] * 1000 if latencies else None,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the tokenizer service.")
+    parser.add_argument("--socket", default=None)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--concurrency", default="1,16,64", help="comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=5000, help="requests per concurrency level")
+    parser.add_argument("--mode", choices=["tokens", "count"], default="count")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    with open(SOURCE, 'r', encoding='utf-8') as file:
+        texts = [line.strip() for line in file]
+    results = [
+        asyncio.run(run_load(texts, int(concurrency), args.requests, args.mode, args.socket, args.host, args.port))
+        for concurrency in args.concurrency.split(",")
+    ]
+    print(json.dumps(results, indent=2))
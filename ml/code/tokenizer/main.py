@@ -1,20 +1,192 @@
+import argparse
+import itertools
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
-import tiktoken
+from cache import TokenCache
+from encoding import CACHE_DIR_ENV, VOCAB_ENV, get_encoding
+from incremental import tokenize_incremental
+from stats import TokenStats
+from streaming import DEFAULT_RANGE_SIZE, list_inputs, tokenize_tree
+from writers import CsvWriter, format_row, open_writer
 
 
-def tokenize_and_print_file(file_path):
+def tokenize_and_print_file(file_path, cache=None):
     '''
       Receives a file path, tokenizes each line and prints the result.
       Prints the result with the input and tokens separated by a comma.
     '''
-    encoding = tiktoken.get_encoding("o200k_base")
+    encoding = cache or get_encoding()
     with open(file_path, 'r', encoding='utf-8') as file:
         for line in file:
             tokens = encoding.encode(line.strip())
-            if ',' in line:
-                print(f"\"{line.strip()}\",\"{tokens}\"")
-            else:
-                print(f"{line.strip()},\"{tokens}\""),
+            print(format_row(line.strip(), tokens))
 
-file = 'resources/o200k.txt'
-tokenize_and_print_file(file)
+
+def read_batches(file_path, batch_size):
+    '''
+      Receives a file path and yields its stripped lines in lists of at most
+      batch_size lines, so only one batch is held in memory at a time.
+    '''
+    batch = []
+    with open(file_path, 'r', encoding='utf-8') as file:
+        for line in file:
+            batch.append(line.strip())
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def _encode_batch_in_process(lines):
+    return get_encoding().encode_batch(lines, num_threads=1)
+
+
+def encode_batches(batches, workers=None, processes=False, cache=None):
+    '''
+      Receives an iterable of line batches and yields (lines, tokens) pairs in
+      input order. Batches are encoded with encode_batch on a thread pool,
+      through the cache when one is given, or on a process pool when
+      processes is set.
+    '''
+    workers = workers or os.cpu_count() or 1
+    if not processes:
+        encoding = cache or get_encoding()
+        for lines in batches:
+            yield lines, encoding.encode_batch(lines, num_threads=workers)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Keep a bounded window of batches in flight so memory stays flat and
+        # results are yielded in submission order.
+        pending = deque()
+        for lines in batches:
+            pending.append((lines, executor.submit(_encode_batch_in_process, lines)))
+            if len(pending) >= workers * 2:
+                lines, future = pending.popleft()
+                yield lines, future.result()
+        for lines, future in pending:
+            yield lines, future.result()
+
+
+def tokenize_file_batched(file_path, batch_size=1024, workers=None, processes=False, writer=None, cache=None):
+    '''
+      Receives a file path, tokenizes its lines in batches across all cores
+      and writes the result in input order, by default in the same CSV format
+      as tokenize_and_print_file. Reports lines/sec and tokens/sec on stderr.
+    '''
+    writer = writer or CsvWriter()
+    line_count = 0
+    token_count = 0
+    start = time.perf_counter()
+    for lines, batch_tokens in encode_batches(read_batches(file_path, batch_size), workers, processes, cache):
+        for line, tokens in zip(lines, batch_tokens):
+            writer.write(line, tokens)
+            token_count += len(tokens)
+        line_count += len(lines)
+    elapsed = time.perf_counter() - start
+    print_throughput(line_count, token_count, elapsed)
+    return line_count, token_count
+
+
+def collect_stats(file_path, batch_size=1024, workers=None, processes=False, cache=None):
+    '''
+      Receives a file or directory path and aggregates token statistics over
+      every input file in one streaming pass, without writing the token ids
+      anywhere.
+    '''
+    stats = TokenStats(get_encoding().n_vocab)
+    start = time.perf_counter()
+    batches = itertools.chain.from_iterable(read_batches(path, batch_size) for path in list_inputs(file_path))
+    for _, batch_tokens in encode_batches(batches, workers, processes, cache):
+        stats.add_batch(batch_tokens)
+    print_throughput(stats.line_count, stats.token_count, time.perf_counter() - start)
+    return stats
+
+
+def print_throughput(line_count, token_count, elapsed):
+    elapsed = max(elapsed, 1e-9)
+    print(
+        f"{line_count} lines, {token_count} tokens in {elapsed:.3f}s "
+        f"({line_count / elapsed:,.0f} lines/s, {token_count / elapsed:,.0f} tokens/s)",
+        file=sys.stderr,
+    )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Tokenize a file line by line with o200k_base.")
+    parser.add_argument("file", nargs="?", default="resources/o200k.txt")
+    parser.add_argument("--batch-size", type=int, default=0,
+                        help="encode lines in batches of this size (0 keeps the per-line loop)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="threads or processes used for batched encoding (default: all cores)")
+    parser.add_argument("--processes", action="store_true",
+                        help="encode batches on a process pool instead of threads")
+    parser.add_argument("--format", choices=["csv", "bin"], default="csv",
+                        help="csv rows, or packed uint32 tokens with a uint64 offsets file")
+    parser.add_argument("--output", default=None,
+                        help="output file for csv (default: stdout) or path prefix for bin")
+    parser.add_argument("--index", action="store_true",
+                        help="also write a <output>.idx row index for csv output (bin shards always have one)")
+    parser.add_argument("--out-dir", default=None,
+                        help="stream a file or directory into per-chunk outputs with a resumable manifest")
+    parser.add_argument("--incremental", action="store_true",
+                        help="with --out-dir, re-encode only chunks that changed since the last run (bin output)")
+    parser.add_argument("--chunk-lines", type=int, default=1024,
+                        help="average lines per content-defined chunk in --incremental mode")
+    parser.add_argument("--range-size", type=int, default=DEFAULT_RANGE_SIZE,
+                        help="bytes per chunk when streaming into --out-dir")
+    parser.add_argument("--stats", action="store_true",
+                        help="print token counts, tokens/line distribution and top tokens instead of ids")
+    parser.add_argument("--top-k", type=int, default=20,
+                        help="number of most frequent tokens reported by --stats")
+    parser.add_argument("--vocab", default=None,
+                        help="local .tiktoken vocab file, so the encoding loads without network access")
+    parser.add_argument("--encoding-cache-dir", default=None,
+                        help="directory for the pre-parsed vocab cache (default: ~/.cache/tokenizer)")
+    parser.add_argument("--cache-size", type=int, default=0,
+                        help="keep up to this many distinct lines in an in-memory token cache")
+    parser.add_argument("--cache-db", default=None,
+                        help="SQLite file backing the token cache across runs")
+    args = parser.parse_args(argv)
+    if args.incremental and not args.out_dir:
+        parser.error("--incremental needs --out-dir")
+    if (args.cache_size or args.cache_db) and (
+        args.processes or args.out_dir or (os.path.isdir(args.file) and not args.stats)
+    ):
+        parser.error("the token cache only applies to single-process tokenization")
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.vocab:
+        os.environ[VOCAB_ENV] = args.vocab
+    if args.encoding_cache_dir:
+        os.environ[CACHE_DIR_ENV] = args.encoding_cache_dir
+    cache = None
+    if args.cache_size or args.cache_db:
+        cache = TokenCache(get_encoding(), args.cache_size or 100_000, args.cache_db)
+    if args.stats:
+        stats = collect_stats(args.file, args.batch_size or 1024, args.workers, args.processes, cache)
+        stats.print_report(get_encoding(), args.top_k)
+    elif args.incremental:
+        tokenize_incremental(args.file, args.out_dir, args.chunk_lines, args.workers)
+    elif args.out_dir or os.path.isdir(args.file):
+        line_count, token_count, elapsed = tokenize_tree(
+            args.file, args.out_dir or "tokens", args.format, args.range_size,
+            args.batch_size or 1024, args.workers, args.index,
+        )
+        print_throughput(line_count, token_count, elapsed)
+    elif args.batch_size > 0 or args.format != "csv" or args.output:
+        with open_writer(args.format, args.output, args.index) as writer:
+            tokenize_file_batched(args.file, args.batch_size or 1024, args.workers, args.processes, writer, cache)
+    else:
+        tokenize_and_print_file(args.file, cache)
+    if cache:
+        cache.print_stats()
+        cache.close()
@@ -0,0 +1,84 @@
+import os
+
+import numpy as np
+
+# Writers always store little-endian values, whatever the host byte order.
+TOKEN_DTYPE = np.dtype("<u4")
+OFFSET_DTYPE = np.dtype("<u8")
+
+
+def _open_map(path, dtype):
+    if os.path.getsize(path) == 0:
+        return np.empty(0, dtype=dtype)  # An empty file cannot be mapped.
+    return np.memmap(path, dtype=dtype, mode='r')
+
+
+class IndexedReader:
+    '''
+      Random access over a data file and its uint64 offsets sidecar, where
+      item i is data[offsets[i]:offsets[i + 1]]. Both files are
+      memory-mapped as NumPy arrays of explicitly little-endian dtypes, so
+      reading a line range is one lookup in the offsets and a zero-copy slice
+      of the data, whatever the file size, and big-endian hosts read the
+      same values. Arrays returned by the reader stay valid after close(),
+      which only drops the reader's references: each file is unmapped once
+      the last array viewing it is garbage collected.
+    '''
+
+    def __init__(self, data_path, index_path, dtype):
+        self.data = _open_map(data_path, dtype)
+        self.offsets = _open_map(index_path, OFFSET_DTYPE)
+
+    def __len__(self):
+        return max(len(self.offsets) - 1, 0)
+
+    def __getitem__(self, line):
+        if line < 0:
+            line += len(self)
+        if not 0 <= line < len(self):
+            raise IndexError(f"line {line} out of range for {len(self)} lines")
+        return self.data[self.offsets[line]:self.offsets[line + 1]]
+
+    def lines(self, start, stop):
+        '''
+          Returns the data of lines start..stop-1 as one flat array,
+          together with each line's offsets relative to it.
+        '''
+        start, stop, _ = slice(start, stop).indices(len(self))
+        stop = max(start, stop)
+        if start == stop:
+            return self.data[0:0], [0]
+        base = self.offsets[start]
+        return self.data[base:self.offsets[stop]], (self.offsets[start:stop + 1] - base).tolist()
+
+    def close(self):
+        self.data = self.offsets = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ShardReader(IndexedReader):
+    '''
+      Reads a shard written by ShardWriter; items are uint32 token arrays.
+
+          with ShardReader("tokens") as shard:
+              shard[10].tolist()   # tokens of line 10
+              shard.lines(10, 20)  # flat tokens of lines 10..19 and their offsets
+    '''
+
+    def __init__(self, prefix):
+        super().__init__(f"{prefix}.bin", f"{prefix}.idx", TOKEN_DTYPE)
+
+
+class CsvReader(IndexedReader):
+    '''
+      Reads a CSV written by CsvWriter with index=True; items are uint8
+      arrays of the raw bytes of each row, including its newline.
+    '''
+
+    def __init__(self, path):
+        super().__init__(path, f"{path}.idx", np.uint8)
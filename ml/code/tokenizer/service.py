@@ -0,0 +1,225 @@
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import sys
+
+from encoding import get_encoding
+
+# Longest request line the service reads; asyncio's default is only 64 KiB.
+MAX_REQUEST_BYTES = 16 * 2**20
+# Token ids serialize to a few bytes per text byte, so responses may be larger.
+MAX_RESPONSE_BYTES = 4 * MAX_REQUEST_BYTES
+
+
+class MicroBatcher:
+    '''
+      Coalesces concurrent encode requests into batches of up to max_batch
+      texts, waiting at most max_wait seconds for a batch to fill. Each batch
+      is encoded with one encode_ordinary_batch call on a worker thread, so
+      the event loop keeps accepting requests meanwhile. If the batch call
+      fails, its texts are encoded one at a time so the error reaches only
+      the requests that caused it.
+    '''
+
+    def __init__(self, encoding, max_batch=256, max_wait=0.002, num_threads=None):
+        self.encoding = encoding
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.num_threads = num_threads or os.cpu_count() or 1
+        self.queue = asyncio.Queue()
+        self.batches = 0
+        self.requests = 0
+
+    async def encode(self, text):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((text, future))
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            texts = [text for text, _ in batch]
+            try:
+                results = await asyncio.to_thread(
+                    self.encoding.encode_ordinary_batch, texts, num_threads=self.num_threads
+                )
+            except Exception:
+                results = await asyncio.to_thread(self._encode_each, texts)
+            for (_, future), tokens in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(tokens, Exception):
+                    future.set_exception(tokens)
+                else:
+                    future.set_result(tokens)
+            self.batches += 1
+            self.requests += len(batch)
+
+    def _encode_each(self, texts):
+        results = []
+        for text in texts:
+            try:
+                results.append(self.encoding.encode_ordinary(text))
+            except Exception as error:
+                results.append(error)
+        return results
+
+
+class TokenizerService:
+    '''
+      Serves newline-delimited JSON over a Unix socket or localhost TCP.
+      A request is {"id": any, "text": str, "mode": "tokens" | "count"} and
+      the response is {"id": ..., "tokens": [...]} or {"id": ..., "count": n},
+      or {"id": ..., "error": str}. Requests on one connection may be
+      pipelined; responses carry the request id and may arrive out of order.
+      A request line longer than max_request_bytes is answered with an error
+      and the connection is closed, since the rest of it cannot be told
+      apart from the next request.
+    '''
+
+    def __init__(self, batcher, max_request_bytes=MAX_REQUEST_BYTES):
+        self.batcher = batcher
+        self.max_request_bytes = max_request_bytes
+
+    async def handle_request(self, line, writer):
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            text = request["text"]
+            if not isinstance(text, str):
+                raise TypeError(f"text must be a string, not {type(text).__name__}")
+            tokens = await self.batcher.encode(text)
+            if request.get("mode", "tokens") == "count":
+                response = {"id": request_id, "count": len(tokens)}
+            else:
+                response = {"id": request_id, "tokens": tokens}
+        except Exception as error:
+            # Malformed requests and texts the encoder rejects alike.
+            response = {"id": request_id, "error": f"{type(error).__name__}: {error}"}
+        writer.write(json.dumps(response).encode() + b"\n")
+        await writer.drain()
+
+    async def handle_connection(self, reader, writer):
+        tasks = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    error = f"request too large: longer than {self.max_request_bytes} bytes"
+                    writer.write(json.dumps({"id": None, "error": error}).encode() + b"\n")
+                    break
+                if not line:
+                    break
+                task = asyncio.create_task(self.handle_request(line, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            writer.close()
+
+    async def serve(self, socket_path=None, host="127.0.0.1", port=8765):
+        batcher_task = asyncio.create_task(self.batcher.run())
+        if socket_path:
+            server = await asyncio.start_unix_server(
+                self.handle_connection, path=socket_path, limit=self.max_request_bytes
+            )
+        else:
+            server = await asyncio.start_server(
+                self.handle_connection, host=host, port=port, limit=self.max_request_bytes
+            )
+        print(f"tokenizer service listening on {socket_path or f'{host}:{port}'}", file=sys.stderr)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher_task.cancel()
+            print(f"{self.batcher.requests} requests in {self.batcher.batches} batches", file=sys.stderr)
+
+
+class TokenizerClient:
+    '''
+      Minimal async client for TokenizerService; safe to share between tasks.
+    '''
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.ids = itertools.count()
+        self.pending = {}
+        self.receiver = asyncio.create_task(self._receive())
+
+    @classmethod
+    async def connect(cls, socket_path=None, host="127.0.0.1", port=8765, limit=MAX_RESPONSE_BYTES):
+        if socket_path:
+            reader, writer = await asyncio.open_unix_connection(socket_path, limit=limit)
+        else:
+            reader, writer = await asyncio.open_connection(host, port, limit=limit)
+        return cls(reader, writer)
+
+    async def _receive(self):
+        while line := await self.reader.readline():
+            response = json.loads(line)
+            future = self.pending.pop(response["id"], None)
+            if future and not future.done():
+                future.set_result(response)
+        for future in self.pending.values():
+            future.set_exception(ConnectionError("tokenizer service closed the connection"))
+
+    async def request(self, text, mode="tokens"):
+        request_id = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+        self.writer.write(json.dumps({"id": request_id, "text": text, "mode": mode}).encode() + b"\n")
+        await self.writer.drain()
+        response = await future
+        if "error" in response:
+            raise ValueError(response["error"])
+        return response[mode]
+
+    async def encode(self, text):
+        return await self.request(text, "tokens")
+
+    async def count(self, text):
+        return await self.request(text, "count")
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+        self.receiver.cancel()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve o200k_base tokenization with micro-batching.")
+    parser.add_argument("--socket", default=None, help="Unix socket path (default: TCP on --host/--port)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-batch", type=int, default=256, help="most requests encoded in one batch")
+    parser.add_argument("--max-wait-ms", type=float, default=2.0, help="longest a request waits for its batch to fill")
+    parser.add_argument("--max-request-bytes", type=int, default=MAX_REQUEST_BYTES, help="longest request line accepted")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    service = TokenizerService(
+        MicroBatcher(get_encoding(), args.max_batch, args.max_wait_ms / 1000), args.max_request_bytes
+    )
+    try:
+        asyncio.run(service.serve(args.socket, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
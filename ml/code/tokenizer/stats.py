@@ -0,0 +1,92 @@
+import itertools
+import sys
+from collections import Counter
+
+import numpy as np
+
+
+class TokenStats:
+    '''
+      Aggregates token statistics in one streaming pass: total tokens, the
+      exact tokens-per-line distribution and token id frequencies. Token ids
+      are counted a batch at a time with np.bincount into a preallocated
+      array of n_vocab counters, so memory is bounded by the vocabulary and
+      the number of distinct line lengths, not by the input size.
+    '''
+
+    def __init__(self, n_vocab):
+        self.line_count = 0
+        self.token_count = 0
+        self.lengths = Counter()
+        self.vocab = np.zeros(n_vocab, dtype=np.int64)
+
+    def add(self, tokens):
+        self.add_batch([tokens])
+
+    def add_batch(self, batch_tokens):
+        lengths = [len(tokens) for tokens in batch_tokens]
+        self.line_count += len(lengths)
+        self.token_count += sum(lengths)
+        self.lengths.update(lengths)
+        ids = np.fromiter(itertools.chain.from_iterable(batch_tokens), dtype=np.uint32, count=sum(lengths))
+        self.vocab += np.bincount(ids, minlength=len(self.vocab))
+
+    def most_common(self, top_k):
+        '''
+          Returns (token, count) pairs of the top_k most frequent token ids,
+          found with argpartition instead of sorting the whole vocabulary.
+        '''
+        top_k = min(top_k, np.count_nonzero(self.vocab))
+        if not top_k:
+            return []
+        top = np.argpartition(self.vocab, -top_k)[-top_k:]
+        top = top[np.argsort(-self.vocab[top], kind='stable')]
+        return [(int(token), int(self.vocab[token])) for token in top]
+
+    def percentile(self, percent):
+        '''
+          Returns the tokens-per-line value below which percent of the lines fall.
+        '''
+        if not self.line_count:
+            return 0
+        rank = percent / 100 * (self.line_count - 1)
+        seen = 0
+        for length in sorted(self.lengths):
+            seen += self.lengths[length]
+            if seen > rank:
+                return length
+        return max(self.lengths)
+
+    def histogram(self):
+        '''
+          Returns (low, high, lines) buckets of tokens per line, doubling in width.
+        '''
+        buckets = Counter()
+        for length, lines in self.lengths.items():
+            buckets[length.bit_length()] += lines
+        return [
+            (0 if bits == 0 else 1 << (bits - 1), 0 if bits == 0 else (1 << bits) - 1, buckets[bits])
+            for bits in sorted(buckets)
+        ]
+
+    def print_report(self, encoding, top_k=20, stream=None):
+        stream = stream or sys.stdout
+        print(f"lines: {self.line_count}", file=stream)
+        print(f"tokens: {self.token_count}", file=stream)
+        print(f"distinct tokens: {np.count_nonzero(self.vocab)}", file=stream)
+        if self.line_count:
+            print(f"mean tokens/line: {self.token_count / self.line_count:.2f}", file=stream)
+        print("tokens/line percentiles: " + ", ".join(
+            f"p{percent}={self.percentile(percent)}" for percent in (50, 90, 95, 99, 100)
+        ), file=stream)
+
+        print("tokens/line histogram:", file=stream)
+        widest = max((lines for _, _, lines in self.histogram()), default=0)
+        for low, high, lines in self.histogram():
+            bar = "#" * max(1, round(40 * lines / widest))
+            print(f"  {low:>6}-{high:<6} {lines:>10} {bar}", file=stream)
+
+        print(f"top {top_k} tokens:", file=stream)
+        for token, count in self.most_common(top_k):
+            text = encoding.decode_single_token_bytes(token).decode('utf-8', errors='replace')
+            print(f"  {token:>7} {count:>10} {text!r}", file=stream)
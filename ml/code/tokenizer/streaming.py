@@ -0,0 +1,201 @@
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from encoding import get_encoding, vocab_fingerprint
+from writers import open_writer
+
+MANIFEST_NAME = "manifest.json"
+DEFAULT_RANGE_SIZE = 64 * 1024 * 1024
+
+
+def list_inputs(path):
+    '''
+      Receives a file or directory path and returns the files to tokenize,
+      sorted so chunk ids are stable between runs.
+    '''
+    if os.path.isfile(path):
+        return [path]
+    files = []
+    for root, dirs, names in os.walk(path):
+        dirs.sort()
+        files.extend(os.path.join(root, name) for name in sorted(names))
+    return files
+
+
+def plan_chunks(files, range_size=DEFAULT_RANGE_SIZE):
+    '''
+      Splits every file into byte ranges of about range_size bytes. A range
+      owns every line that starts inside it, so ranges can be read
+      independently and still cover each line exactly once.
+    '''
+    chunks = []
+    for file_index, file_path in enumerate(files):
+        size = os.path.getsize(file_path)
+        for start in range(0, max(size, 1), range_size):
+            chunks.append({
+                "id": f"{file_index:05d}-{start:015d}",
+                "file": file_path,
+                "start": start,
+                "end": min(start + range_size, size),
+            })
+    return chunks
+
+
+def read_range(file_path, start, end):
+    '''
+      Yields the stripped lines that start in the [start, end) byte range of
+      a file, reading one line at a time.
+    '''
+    with open(file_path, 'rb') as file:
+        if start > 0:
+            # Skip the tail of a line owned by the previous range.
+            file.seek(start - 1)
+            file.readline()
+        while file.tell() < end:
+            line = file.readline()
+            if not line:
+                break
+            yield line.decode('utf-8').strip()
+
+
+def tokenize_chunk(chunk, out_dir, output_format, batch_size, index=False):
+    '''
+      Tokenizes one chunk into its own output file. The output is written
+      under a temporary name and renamed once complete, so a crash never
+      leaves a partial file that looks finished.
+    '''
+    encoding = get_encoding()
+    tmp_path = os.path.join(out_dir, f"{chunk['id']}.tmp")
+    final_path = os.path.join(out_dir, chunk["id"])
+    line_count = 0
+    token_count = 0
+
+    def write_batch(writer, lines):
+        nonlocal line_count, token_count
+        for line, tokens in zip(lines, encoding.encode_batch(lines, num_threads=1)):
+            writer.write(line, tokens)
+            token_count += len(tokens)
+        line_count += len(lines)
+
+    writer_path = tmp_path + ".csv" if output_format == "csv" else tmp_path
+    with open_writer(output_format, writer_path, index) as writer:
+        batch = []
+        for line in read_range(chunk["file"], chunk["start"], chunk["end"]):
+            batch.append(line)
+            if len(batch) == batch_size:
+                write_batch(writer, batch)
+                batch = []
+        if batch:
+            write_batch(writer, batch)
+
+    for suffix in _output_suffixes(output_format, index):
+        os.replace(tmp_path + suffix, final_path + suffix)
+    return chunk["id"], line_count, token_count
+
+
+def _output_suffixes(output_format, index):
+    if output_format == "bin":
+        return [".bin", ".idx"]
+    return [".csv", ".csv.idx"] if index else [".csv"]
+
+
+def describe_inputs(files):
+    '''
+      Returns the path, size and mtime of each input file, in order. Chunk
+      ids are positions in this list, so any change to it invalidates them.
+    '''
+    inputs = []
+    for file_path in files:
+        stat = os.stat(file_path)
+        inputs.append({"path": os.path.abspath(file_path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns})
+    return inputs
+
+
+def load_manifest(out_dir, settings, inputs):
+    '''
+      Returns the progress manifest of out_dir, or a fresh one. Resuming with
+      different settings, vocab included, or after input files were added, removed or
+      modified, would mix incompatible chunks, so it is refused.
+    '''
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {"settings": settings, "inputs": inputs, "chunks": {}}
+    with open(path, 'r', encoding='utf-8') as file:
+        manifest = json.load(file)
+    if manifest["settings"] != settings:
+        raise ValueError(f"{path} was written with different settings: {manifest['settings']}")
+    if manifest.get("inputs") != inputs:
+        previous = {entry["path"]: entry for entry in manifest.get("inputs", [])}
+        changed = [entry["path"] for entry in inputs if previous.pop(entry["path"], None) != entry]
+        raise ValueError(
+            f"{path} was written for different input files "
+            f"(changed or added: {changed}, removed: {list(previous)}); "
+            f"use a fresh output directory"
+        )
+    return manifest
+
+
+def save_manifest(out_dir, manifest):
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as file:
+        json.dump(manifest, file, indent=2)
+    os.replace(tmp_path, path)
+
+
+def tokenize_tree(input_path, out_dir, output_format="bin", range_size=DEFAULT_RANGE_SIZE,
+                  batch_size=1024, workers=None, index=False):
+    '''
+      Receives a file or directory and tokenizes every file into per-chunk
+      outputs in out_dir, spreading chunks across worker processes. Memory
+      per worker is bounded by batch_size lines. Completed chunks are recorded
+      in out_dir/manifest.json, and a rerun over the same unchanged inputs
+      skips them, so a crashed run resumes from the last completed chunk.
+    '''
+    os.makedirs(out_dir, exist_ok=True)
+    files = list_inputs(input_path)
+    settings = {
+        "format": output_format,
+        "range_size": range_size,
+        "index": index,
+        "vocab": vocab_fingerprint(get_encoding()).hex(),
+    }
+    manifest = load_manifest(out_dir, settings, describe_inputs(files))
+    chunks = [chunk for chunk in plan_chunks(files, range_size) if chunk["id"] not in manifest["chunks"]]
+    workers = workers or os.cpu_count() or 1
+
+    start = time.perf_counter()
+    line_count = 0
+    token_count = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = {}
+        remaining = iter(chunks)
+        while True:
+            for chunk in remaining:
+                future = executor.submit(tokenize_chunk, chunk, out_dir, output_format, batch_size, index)
+                pending[future] = chunk
+                if len(pending) >= workers * 2:
+                    break
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                chunk = pending.pop(future)
+                chunk_id, lines, tokens = future.result()
+                manifest["chunks"][chunk_id] = {
+                    "file": chunk["file"],
+                    "start": chunk["start"],
+                    "end": chunk["end"],
+                    "lines": lines,
+                    "tokens": tokens,
+                }
+                save_manifest(out_dir, manifest)
+                line_count += lines
+                token_count += tokens
+
+    elapsed = time.perf_counter() - start
+    print(f"{len(chunks)} chunks tokenized, {len(manifest['chunks']) - len(chunks)} resumed", file=sys.stderr)
+    return line_count, token_count, elapsed
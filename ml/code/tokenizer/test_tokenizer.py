@@ -0,0 +1,153 @@
+import base64
+import itertools
+import json
+import os
+import shutil
+
+import pytest
+
+from encoding import CACHE_DIR_ENV, VOCAB_ENV, get_encoding
+from incremental import tokenize_incremental
+from main import tokenize_and_print_file, tokenize_file_batched
+from reader import CsvReader, ShardReader
+from streaming import MANIFEST_NAME, tokenize_tree
+from writers import open_writer
+
+SAMPLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "o200k.txt")
+MERGES = [b"th", b"he", b"the", b" t", b" the", b"in", b"ing", b"an", b"and", b"er", b"on", b"re", b" a"]
+
+
+def write_vocab(path, merges):
+    '''
+      Writes a .tiktoken vocab of every single byte plus merges, so the tests
+      run without downloading the o200k_base ranks.
+    '''
+    tokens = [bytes([byte]) for byte in range(256)] + merges
+    with open(path, 'w') as file:
+        for rank, token in enumerate(tokens):
+            file.write(f"{base64.b64encode(token).decode()} {rank}\n")
+    return str(path)
+
+
+@pytest.fixture(scope="session")
+def vocab_dir(tmp_path_factory):
+    return tmp_path_factory.mktemp("vocab")
+
+
+@pytest.fixture(autouse=True)
+def toy_vocab(vocab_dir, monkeypatch):
+    # Environment variables, like main.py, so worker processes see them too.
+    monkeypatch.setenv(VOCAB_ENV, write_vocab(vocab_dir / "toy.tiktoken", MERGES))
+    monkeypatch.setenv(CACHE_DIR_ENV, str(vocab_dir / "cache"))
+    get_encoding.cache_clear()
+    yield
+    get_encoding.cache_clear()
+
+
+def use_other_vocab(vocab_dir, monkeypatch):
+    monkeypatch.setenv(VOCAB_ENV, write_vocab(vocab_dir / "other.tiktoken", MERGES[:-1]))
+    get_encoding.cache_clear()
+
+
+def expected_tokens(path):
+    with open(path, 'r', encoding='utf-8') as file:
+        return [get_encoding().encode(line.strip()) for line in file]
+
+
+def test_batched_csv_matches_the_per_line_loop(tmp_path, capsys):
+    tokenize_and_print_file(SAMPLE)
+    expected = capsys.readouterr().out
+
+    for processes in (False, True):
+        output = tmp_path / f"tokens-{processes}.csv"
+        with open_writer("csv", str(output), index=True) as writer:
+            tokenize_file_batched(SAMPLE, batch_size=50, workers=2, processes=processes, writer=writer)
+        assert output.read_text(encoding='utf-8') == expected
+
+    rows = expected.splitlines(keepends=True)
+    with CsvReader(str(output)) as reader:
+        assert len(reader) == len(rows)
+        assert bytes(reader[3]).decode('utf-8') == rows[3]
+
+
+def test_bin_shards_round_trip_through_the_reader(tmp_path):
+    prefix = str(tmp_path / "tokens")
+    with open_writer("bin", prefix) as writer:
+        tokenize_file_batched(SAMPLE, batch_size=64, workers=2, writer=writer)
+    expected = expected_tokens(SAMPLE)
+
+    with ShardReader(prefix) as shard:
+        assert len(shard) == len(expected)
+        assert all(shard[i].tolist() == tokens for i, tokens in enumerate(expected))
+        flat, offsets = shard.lines(10, 20)
+        first = shard[0]
+    assert flat.tolist() == sum(expected[10:20], [])
+    assert offsets == [0, *itertools.accumulate(len(tokens) for tokens in expected[10:20])]
+    # Arrays from the reader outlive it.
+    assert first.tolist() == expected[0]
+
+
+def test_an_interrupted_run_resumes_where_it_stopped(tmp_path, vocab_dir, monkeypatch):
+    inputs = tmp_path / "inputs"
+    inputs.mkdir()
+    shutil.copy(SAMPLE, inputs / "a.txt")
+    with open(SAMPLE, 'r', encoding='utf-8') as file:
+        (inputs / "b.txt").write_text("".join(reversed(file.readlines()[:200])), encoding='utf-8')
+
+    full_dir, out_dir = tmp_path / "full", tmp_path / "out"
+    total_lines, total_tokens, _ = tokenize_tree(str(inputs), str(full_dir), "bin", 2048, 32, 2)
+    tokenize_tree(str(inputs), str(out_dir), "bin", 2048, 32, 2)
+
+    # Crash halfway: the later chunks were never recorded, one of them left
+    # a temporary file behind.
+    manifest_path = out_dir / MANIFEST_NAME
+    manifest = json.loads(manifest_path.read_text())
+    chunk_ids = sorted(manifest["chunks"])
+    lost = chunk_ids[len(chunk_ids) // 2:]
+    for chunk_id in lost:
+        del manifest["chunks"][chunk_id]
+        for suffix in (".bin", ".idx"):
+            os.remove(out_dir / f"{chunk_id}{suffix}")
+    (out_dir / f"{lost[0]}.tmp.bin").write_bytes(b"partial")
+    manifest_path.write_text(json.dumps(manifest))
+
+    lines, tokens, _ = tokenize_tree(str(inputs), str(out_dir), "bin", 2048, 32, 2)
+
+    assert len(chunk_ids) > 4
+    assert 0 < lines < total_lines and 0 < tokens < total_tokens
+    for chunk_id in chunk_ids:
+        for suffix in (".bin", ".idx"):
+            name = f"{chunk_id}{suffix}"
+            assert (out_dir / name).read_bytes() == (full_dir / name).read_bytes(), name
+    assert tokenize_tree(str(inputs), str(out_dir), "bin", 2048, 32, 2)[:2] == (0, 0)
+
+    use_other_vocab(vocab_dir, monkeypatch)
+    with pytest.raises(ValueError, match="different settings"):
+        tokenize_tree(str(inputs), str(out_dir), "bin", 2048, 32, 2)
+
+
+def test_an_edit_only_re_encodes_the_chunks_around_it(tmp_path, vocab_dir, monkeypatch):
+    with open(SAMPLE, 'r', encoding='utf-8') as file:
+        sample = [line.strip() for line in file]
+    # Numbered, so no two chunks have the same content.
+    lines = [f"{i} {line}" for i, line in enumerate(sample * 3)]
+    input_path, out_dir = tmp_path / "input.txt", tmp_path / "out"
+    input_path.write_text("\n".join(lines) + "\n", encoding='utf-8')
+
+    encoded, reused, _ = tokenize_incremental(str(input_path), str(out_dir), 32, 2)
+    assert reused == 0 and encoded > 4
+
+    lines[600] = "an edited line"
+    lines.insert(601, "and an inserted one")
+    input_path.write_text("\n".join(lines) + "\n", encoding='utf-8')
+    edited, kept, _ = tokenize_incremental(str(input_path), str(out_dir), 32, 2)
+
+    assert 0 < edited <= 3 and kept >= encoded - 3
+    expected = expected_tokens(input_path)
+    with ShardReader(str(out_dir / "input.txt")) as shard:
+        assert [row.tolist() for row in shard] == expected
+
+    # Chunks encoded with another vocab are not reused.
+    use_other_vocab(vocab_dir, monkeypatch)
+    encoded, reused, _ = tokenize_incremental(str(input_path), str(out_dir), 32, 2)
+    assert (encoded, reused) == (edited + kept, 0)
@@ -0,0 +1,113 @@
+import sys
+from array import array
+
+TOKEN_TYPECODE = "I"
+OFFSET_TYPECODE = "Q"
+
+assert array(TOKEN_TYPECODE).itemsize == 4, "token arrays must be uint32"
+assert array(OFFSET_TYPECODE).itemsize == 8, "offset arrays must be uint64"
+
+
+def format_row(line, tokens):
+    '''
+      Formats a stripped line and its tokens as a CSV row.
+      The line is quoted only when it contains a comma.
+    '''
+    if ',' in line:
+        return f"\"{line}\",\"{tokens}\""
+    return f"{line},\"{tokens}\""
+
+
+def to_little_endian(values):
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+class CsvWriter:
+    '''
+      Writes one "line","[tokens]" row per input line, the original output
+      format. With an index path it also writes the uint64 byte offset of
+      every row plus the end of file, for random access with CsvReader.
+    '''
+
+    def __init__(self, stream=None, index_path=None):
+        self.stream = stream or sys.stdout
+        self.index_file = open(index_path, "wb") if index_path else None
+        self.offset = 0
+        if self.index_file:
+            to_little_endian(array(OFFSET_TYPECODE, [0])).tofile(self.index_file)
+
+    def write(self, line, tokens):
+        row = format_row(line, tokens) + "\n"
+        self.stream.write(row)
+        if self.index_file:
+            self.offset += len(row.encode("utf-8"))
+            to_little_endian(array(OFFSET_TYPECODE, [self.offset])).tofile(self.index_file)
+
+    def close(self):
+        if self.index_file:
+            self.index_file.close()
+        if self.stream is sys.stdout:
+            self.stream.flush()
+        else:
+            self.stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ShardWriter:
+    '''
+      Writes tokens as a binary shard: <prefix>.bin holds every token as a
+      packed little-endian uint32 and <prefix>.idx holds little-endian uint64
+      token offsets, one per line plus a leading 0, so the tokens of line i are
+      bin[idx[i]:idx[i + 1]]. Both files can be memory-mapped directly, e.g.
+      with numpy.memmap(path, dtype="<u4").
+    '''
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self.bin_path = f"{prefix}.bin"
+        self.idx_path = f"{prefix}.idx"
+        self.bin_file = open(self.bin_path, "wb")
+        self.idx_file = open(self.idx_path, "wb")
+        self.offset = 0
+        to_little_endian(array(OFFSET_TYPECODE, [0])).tofile(self.idx_file)
+
+    def write(self, line, tokens):
+        to_little_endian(array(TOKEN_TYPECODE, tokens)).tofile(self.bin_file)
+        self.offset += len(tokens)
+        to_little_endian(array(OFFSET_TYPECODE, [self.offset])).tofile(self.idx_file)
+
+    def close(self):
+        self.bin_file.close()
+        self.idx_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_writer(output_format, output=None, index=False):
+    '''
+      Receives an output format ("csv" or "bin") and an optional output path
+      and returns the matching writer. CSV goes to stdout when no path is
+      given, and writes an <output>.idx row index when index is set; bin
+      shards always have one.
+    '''
+    if output_format == "csv":
+        if index and not output:
+            raise ValueError("a csv index needs an output path")
+        stream = open(output, "w", encoding="utf-8", newline="") if output else None
+        return CsvWriter(stream, f"{output}.idx" if index else None)
+    if output_format == "bin":
+        if not output:
+            raise ValueError("the bin format needs an output path prefix")
+        return ShardWriter(output)
+    raise ValueError(f"unknown output format: {output_format}")